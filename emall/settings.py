@@ -10,9 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import multiprocessing
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,9 +31,9 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 DEBUG = os.getenv("DEBUG", "False") == "True"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Set DEBUG=True in .env for local development.
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
 
 
 # Application definition
@@ -59,17 +61,28 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "emall.urls"
 
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "spaces.context_processors.cache_versions",
             ],
+            # production profile: compile each template once per process
+            "loaders": (
+                TEMPLATE_LOADERS
+                if DEBUG
+                else [("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)]
+            ),
         },
     },
 ]
@@ -79,6 +92,19 @@ WSGI_APPLICATION = "emall.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+# With DB_POOL=True each worker process keeps a psycopg connection pool of
+# DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections; a request waits up to
+# DB_POOL_TIMEOUT seconds for one. Otherwise connections persist for
+# DB_CONN_MAX_AGE seconds (0 closes them after every request).
+# The pools of all WEB_CONCURRENCY workers share DB_MAX_CONNECTIONS (90,
+# leaving room under PostgreSQL's default max_connections of 100 for
+# migrations and psql); DB_POOL_MAX_SIZE defaults to each worker's share,
+# at most 10.
+
+DB_POOL = os.getenv("DB_POOL", "True") == "True"
+# worker count as in gunicorn.conf.py
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "90"))
 
 DATABASES = {
     "default": {
@@ -88,9 +114,91 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
+        "OPTIONS": {},
+    }
+}
+
+if DB_POOL:
+    pool_max_size = int(
+        os.getenv("DB_POOL_MAX_SIZE", min(10, DB_MAX_CONNECTIONS // WEB_CONCURRENCY))
+    )
+    if not 0 < pool_max_size * WEB_CONCURRENCY <= DB_MAX_CONNECTIONS:
+        raise ImproperlyConfigured(
+            f"{WEB_CONCURRENCY} workers with DB_POOL_MAX_SIZE={pool_max_size} "
+            f"do not fit in DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS}"
+        )
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": min(int(os.getenv("DB_POOL_MIN_SIZE", "2")), pool_max_size),
+        "max_size": pool_max_size,
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# CACHE_BACKEND is "locmem" (per process) or "file" (shared by the workers
+# of one host, stored under CACHE_LOCATION)
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "10000"))},
     }
 }
 
+# Lifetime of cached browse data; entries are also replaced as soon as the
+# data they were built from changes
+SPACES_CACHE_TIMEOUT = int(os.getenv("SPACES_CACHE_TIMEOUT", "3600"))
+
+# Sessions
+# SESSION_ENGINE is "cached_db" (cache first, database fallback, no write
+# when the data is unchanged), "db", "cache" or "signed_cookies" (no server
+# storage; suits deployments where most traffic is anonymous browsing).
+# "cached_db" and "cache" need a cache shared by all workers, so they are
+# refused with CACHE_BACKEND=locmem: a worker would keep serving its own
+# copy of a session after another worker changed or deleted it. The
+# default is "cached_db" with a shared cache and "db" otherwise.
+# Expired database sessions are removed with `manage.py purge_sessions`.
+
+SESSION_ENGINES = {
+    "cached_db": "spaces.sessions",
+    "db": "django.contrib.sessions.backends.db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+session_engine = os.getenv(
+    "SESSION_ENGINE", "db" if CACHE_BACKEND == "locmem" else "cached_db"
+)
+if CACHE_BACKEND == "locmem" and session_engine in ("cached_db", "cache"):
+    raise ImproperlyConfigured(
+        f"SESSION_ENGINE={session_engine} needs a shared cache; "
+        "set CACHE_BACKEND=file"
+    )
+SESSION_ENGINE = SESSION_ENGINES[session_engine]
+
+# Authentication
+# Users sign in with their username or email (case-insensitive). With
+# AUTH_USER_CACHE=True the user behind each session is cached for
+# AUTH_USER_CACHE_TIMEOUT seconds instead of read from auth_user on every
+# request; a local-memory cache is per worker, so only another worker's
+# copy can outlive a password change, and at most for that timeout.
+
+AUTHENTICATION_BACKENDS = ["spaces.auth.EmailOrUsernameBackend"]
+
+AUTH_USER_CACHE = os.getenv("AUTH_USER_CACHE", "False") == "True"
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "300"))
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -133,5 +241,69 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Production serving: with SERVE_STATIC=True collectstatic writes
+# manifest-hashed, gzipped copies to STATIC_ROOT and StaticFilesMiddleware
+# serves them (and MEDIA_ROOT) with long-lived cache headers
+SERVE_STATIC = os.getenv("SERVE_STATIC", "False") == "True"
+STATIC_ROOT = os.getenv("STATIC_ROOT", BASE_DIR / "staticfiles")
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "spaces.storage.CompressedManifestStaticFilesStorage"
+            if SERVE_STATIC
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        )
+    },
+}
+
+if SERVE_STATIC:
+    MIDDLEWARE.insert(1, "spaces.middleware.StaticFilesMiddleware")
+
+# Request instrumentation (opt-in): Server-Timing headers, a slow-request
+# log and per-URL Prometheus metrics at /metrics/ (staff, or a scraper
+# sending "Authorization: Bearer <INSTRUMENTATION_METRICS_TOKEN>")
+INSTRUMENTATION = os.getenv("INSTRUMENTATION", "False") == "True"
+INSTRUMENTATION_SLOW_MS = int(os.getenv("INSTRUMENTATION_SLOW_MS", "500"))
+INSTRUMENTATION_TOP_QUERIES = int(os.getenv("INSTRUMENTATION_TOP_QUERIES", "5"))
+INSTRUMENTATION_SERVER_TIMING = (
+    os.getenv("INSTRUMENTATION_SERVER_TIMING", "True") == "True"
+)
+INSTRUMENTATION_METRICS_TOKEN = os.getenv("INSTRUMENTATION_METRICS_TOKEN", "")
+
+if INSTRUMENTATION:
+    # after the static files, which would only skew the per-URL numbers
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.contrib.sessions.middleware.SessionMiddleware"),
+        "spaces.middleware.InstrumentationMiddleware",
+    )
+    TEMPLATES[0]["BACKEND"] = "spaces.instrumentation.TimedDjangoTemplates"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "spaces.performance": {"handlers": ["console"], "level": "WARNING"},
+    },
+}
+
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
+
+# Public holidays (ISO dates, comma separated) used when pricing spaces
+# rented on "Week Days" or "Public Holidays"
+PUBLIC_HOLIDAYS = [day for day in os.getenv("PUBLIC_HOLIDAYS", "").split(",") if day]
+
+# Browser (max-age) and front cache (s-maxage) lifetimes, in seconds, of
+# browse pages served to anonymous visitors; signed-in pages are private
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+HTTP_CACHE_SHARED_MAX_AGE = int(os.getenv("HTTP_CACHE_SHARED_MAX_AGE", "60"))
+
+# How long a confirmed booking holds its dates while the user pays
+RESERVATION_HOLD_MINUTES = int(os.getenv("RESERVATION_HOLD_MINUTES", "10"))
+
+# Length of a bookable time slot of "Hour Wise" spaces; must divide a day
+# into at most 63 slots (each day's slots are one 64-bit bitmap)
+SPACES_SLOT_MINUTES = int(os.getenv("SPACES_SLOT_MINUTES", "60"))
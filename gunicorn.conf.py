@@ -0,0 +1,31 @@
+"""Gunicorn settings for serving emall.asgi:application in production.
+
+Each worker is a uvicorn event loop, so the async views keep serving other
+requests while one waits on the database or a slow client.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Cache version keys, page stamps and ETags must be the same in every
+# worker; a local-memory cache would give each worker its own.
+if workers > 1 and os.getenv("CACHE_BACKEND", "locmem") == "locmem":
+    raise RuntimeError(
+        "WEB_CONCURRENCY > 1 needs a cache shared by the workers; "
+        "set CACHE_BACKEND=file"
+    )
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
@@ -1,12 +1,129 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-from .models import Booking, BusinessSpace, Category
+from .exports import export_queryset, export_response
+from .models import Booking, BusinessSpace, Category, DailyOccupancy
+from .rollups import year_report
 
 # Register your models here.
 # override the default admin panel
 """class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'image')"""
 
-admin.site.register(Category)
-admin.site.register(BusinessSpace)
-admin.site.register(Booking)
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that reads the row count of an unfiltered changelist from
+    the planner's statistics instead of running COUNT(*) on PostgreSQL.
+
+    Small tables, filtered lists and other databases are counted exactly.
+    """
+
+    estimate_above = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.estimate_above:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow without bound."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ("category", "description", "cost_per_unit")
+    search_fields = ("category", "description")
+
+
+@admin.register(BusinessSpace)
+class BusinessSpaceAdmin(LargeTableAdmin):
+    list_display = ("name", "category", "rent_type", "cost", "availability")
+    list_select_related = ("category",)
+    list_filter = ("category", "availability")
+    search_fields = ("name",)
+    autocomplete_fields = ("category",)
+    ordering = ("id",)
+
+
+@admin.register(Booking)
+class BookingAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "space", "from_date", "to_date", "is_paid")
+    list_select_related = ("user", "space")
+    # is_paid and created_at are served by booking_paid_created_idx and
+    # booking_created_idx
+    list_filter = ("is_paid", "created_at")
+    date_hierarchy = "created_at"
+    ordering = ("-created_at", "-id")
+    raw_id_fields = ("user",)
+    autocomplete_fields = ("space",)
+    search_fields = ("=id", "=user__username", "space__name")
+    # the day's SlotDay mask is only kept in step through checkout
+    readonly_fields = ("slot_mask",)
+    actions = ["export_csv", "export_jsonl", "export_invoices"]
+
+    def get_readonly_fields(self, request, obj=None):
+        # moving a slot booking would leave its bits on the old SlotDay
+        if obj is not None and obj.slot_mask is not None:
+            return self.readonly_fields + ("space", "from_date", "to_date")
+        return self.readonly_fields
+
+    # Exports stream the selected bookings (or every booking matching the
+    # current filters with "select all") without loading them at once.
+    @admin.action(description="Export selected bookings as CSV")
+    def export_csv(self, request, queryset):
+        return export_response(export_queryset(queryset), "csv")
+
+    @admin.action(description="Export selected bookings as JSON Lines")
+    def export_jsonl(self, request, queryset):
+        return export_response(export_queryset(queryset), "jsonl")
+
+    @admin.action(description="Download invoices of selected bookings (ZIP)")
+    def export_invoices(self, request, queryset):
+        return export_response(export_queryset(queryset), "zip", "invoices")
+
+
+@admin.register(DailyOccupancy)
+class OccupancyReportAdmin(admin.ModelAdmin):
+    """Read-only dashboard over the daily occupancy rollup."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        try:
+            year = int(request.GET.get("year", timezone.localdate().year))
+        except ValueError:
+            year = timezone.localdate().year
+        year = min(max(year, 2), 9998)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Occupancy and revenue",
+            "report": year_report(year),
+        }
+        return TemplateResponse(request, "admin/spaces/occupancy_report.html", context)
@@ -0,0 +1,194 @@
+"""Read-only JSON API for kiosks and partner sites.
+
+Every response carries a strong ETag derived from the "catalog" and
+"bookings" data versions (see spaces.cache), today's date and the full
+request path. A matching ``If-None-Match`` is answered with 304 from those
+alone - no database query, no view code. Lists page by an opaque cursor
+over space ids.
+"""
+
+import base64
+import binascii
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotModified, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+
+from .availability import parse_booking_dates, space_availability
+from .cache import aget_versions
+from .listings import acategories, acategory_codes, acategory_listing
+from .models import Booking, BusinessSpace
+
+# compact separators; the default ones add a space after every item
+JSON_PARAMS = {"separators": (",", ":")}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params=JSON_PARAMS)
+
+
+def versioned(*namespaces):
+    """Tag responses with an ETag and answer If-None-Match with 304 early.
+
+    Errors are neither tagged nor cached.
+    """
+
+    def decorator(view):
+        @require_safe
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            versions = await aget_versions(*namespaces)
+            seed = f"{request.get_full_path()}|{timezone.localdate()}|{versions}"
+            etag = f'"{hashlib.sha1(seed.encode()).hexdigest()[:20]}"'
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                response = HttpResponseNotModified()
+            else:
+                try:
+                    response = await view(request, *args, **kwargs)
+                except ApiError as error:
+                    return _json({"error": str(error)}, status=error.status)
+            response.headers["ETag"] = etag
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def encode_cursor(after):
+    return base64.urlsafe_b64encode(str(after).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ApiError("Invalid cursor")
+
+
+def _search(request):
+    from_date, to_date = request.GET.get("from_date"), request.GET.get("to_date")
+    if not (from_date or to_date):
+        return None
+    try:
+        return parse_booking_dates(from_date, to_date)
+    except ValueError as error:
+        raise ApiError(str(error))
+
+
+def space_data(space):
+    data = {
+        "id": space.id,
+        "name": space.name,
+        "category": space.category.category,
+        "rent_type": space.rent_type,
+        "duration_type": space.duration_type,
+        "cost": space.cost,
+        "available": space.availability,
+        "image": space.image.url if space.image else None,
+    }
+    if hasattr(space, "booked_till"):
+        data["booked_till"] = space.booked_till
+    return data
+
+
+def _intervals(intervals):
+    return [[start, end] for start, end in intervals]
+
+
+@versioned("catalog")
+async def categories(request):
+    return _json(
+        {
+            "results": [
+                {
+                    "code": category.category,
+                    "name": category.get_category_display(),
+                    "description": category.description,
+                    "cost_per_unit": category.cost_per_unit,
+                }
+                for category in await acategories()
+            ]
+        }
+    )
+
+
+@versioned("catalog", "bookings")
+async def category_spaces(request, category):
+    if category not in await acategory_codes():
+        raise ApiError("No such category", status=404)
+    spaces, next_after = await acategory_listing(
+        category, decode_cursor(request.GET.get("cursor")), _search(request)
+    )
+
+    next_url = None
+    if next_after:
+        query = request.GET.copy()
+        query["cursor"] = encode_cursor(next_after)
+        next_url = f"{request.path}?{query.urlencode()}"
+    return _json({"results": [space_data(space) for space in spaces], "next": next_url})
+
+
+async def _get_space(space_id):
+    try:
+        return await BusinessSpace.objects.select_related("category").aget(pk=space_id)
+    except BusinessSpace.DoesNotExist:
+        raise ApiError("No such space", status=404)
+
+
+@versioned("catalog", "bookings")
+async def space_detail(request, space_id):
+    space = await _get_space(space_id)
+    calendar = await sync_to_async(space_availability)(space)
+    data = space_data(space)
+    data.update(
+        {
+            "description": space.description,
+            "from": calendar["start"],
+            "to": calendar["end"],
+            "booked": _intervals(calendar["booked"]),
+            "free": _intervals(calendar["free"]),
+            "availability_url": reverse("api_space_availability", args=[space.id]),
+        }
+    )
+    return _json(data)
+
+
+@versioned("catalog", "bookings")
+async def space_availability_query(request, space_id):
+    search = _search(request)
+    if search is None:
+        raise ApiError("from_date and to_date are required")
+    space = await _get_space(space_id)
+    from_date, to_date = search
+    conflicts = (
+        Booking.objects.whole_days()
+        .overlapping(space, from_date, to_date)
+        .order_by("from_date")
+    )
+    booked = [
+        interval async for interval in conflicts.values_list("from_date", "to_date")
+    ]
+    return _json(
+        {
+            "space": space.id,
+            "from": from_date,
+            "to": to_date,
+            "available": space.availability and not booked,
+            "booked": _intervals(booked),
+        }
+    )
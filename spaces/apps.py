@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SpacesConfig(AppConfig):
     name = "spaces"
+
+    def ready(self):
+        from . import signals  # noqa: F401
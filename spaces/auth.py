@@ -0,0 +1,85 @@
+"""Authentication backend: sign in with a username or an email address.
+
+Both lookups are case-insensitive and use the UPPER(username) and
+UPPER(email) indexes on auth_user (migration 0010). Email addresses are not
+unique, so every account sharing the address is tried and the first whose
+password matches signs in.
+
+With AUTH_USER_CACHE enabled the user loaded for each request is kept in
+the cache; saving the user (password changes included) or logging out
+drops the cached copy.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models import Q
+
+UserModel = get_user_model()
+
+
+def user_cache_key(user_id):
+    return f"spaces:user:{user_id}"
+
+
+def user_cache_enabled():
+    return getattr(settings, "AUTH_USER_CACHE", False)
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if not username or password is None:
+            return None
+
+        candidates = UserModel._default_manager.filter(
+            Q(username__iexact=username) | Q(email__iexact=username)
+        ).order_by("id")
+        # an exact username match beats accounts that share the email
+        candidates = sorted(candidates, key=lambda user: user.username != username)
+        if not candidates:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            UserModel().set_password(password)
+            return None
+
+        for user in candidates:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        return await sync_to_async(self.authenticate)(
+            request, username, password, **kwargs
+        )
+
+    def get_user(self, user_id):
+        if not user_cache_enabled():
+            return super().get_user(user_id)
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        if not user_cache_enabled():
+            return await super().aget_user(user_id)
+
+        key = user_cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from .models import Booking
+
+# The booking view rejects same-day bookings, so the shortest bookable
+# window is two calendar days (both ends inclusive).
+MIN_BOOKING_DAYS = 2
+DEFAULT_HORIZON_DAYS = 180
+
+
+def parse_booking_dates(from_date_str, to_date_str, today=None):
+    """Parse and validate a requested booking range.
+
+    Raises ValueError with a user facing message when the range is not
+    bookable.
+    """
+    today = today or timezone.localdate()
+    try:
+        from_date = datetime.strptime(from_date_str, "%Y-%m-%d").date()
+        to_date = datetime.strptime(to_date_str, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date format")
+
+    #  From date must be today or future
+    if from_date < today:
+        raise ValueError("From date cannot be in the past")
+
+    #  To date after from date
+    if from_date > to_date:
+        raise ValueError("To date must be after from date")
+
+    #  Same day booking check
+    if (to_date - from_date).days + 1 < MIN_BOOKING_DAYS:
+        raise ValueError(f"Booking must be for at least {MIN_BOOKING_DAYS} days")
+
+    return from_date, to_date
+
+
+def booked_intervals(space, start, end):
+    """Merged, sorted (from_date, to_date) intervals booked within the horizon.
+
+    Runs a single query; touching or overlapping bookings are merged while
+    walking them in from_date order. Slot bookings do not book a whole day
+    and are left out.
+    """
+    rows = (
+        Booking.objects.whole_days()
+        .overlapping(space, start, end)
+        .order_by("from_date")
+        .values_list("from_date", "to_date")
+    )
+
+    merged = []
+    for from_date, to_date in rows:
+        if merged and from_date <= merged[-1][1] + timedelta(days=1):
+            if to_date > merged[-1][1]:
+                merged[-1][1] = to_date
+        else:
+            merged.append([from_date, to_date])
+    return [(from_date, to_date) for from_date, to_date in merged]
+
+
+def free_windows(booked, start, end, min_days=MIN_BOOKING_DAYS):
+    """Gaps of at least ``min_days`` between merged booked intervals.
+
+    A window that reaches the end of the horizon is open ended and is
+    returned with ``None`` as its last day.
+    """
+    windows = []
+    cursor = start
+    for from_date, to_date in booked:
+        if from_date > cursor and (from_date - cursor).days >= min_days:
+            windows.append((cursor, from_date - timedelta(days=1)))
+        cursor = max(cursor, to_date + timedelta(days=1))
+    if cursor <= end:
+        windows.append((cursor, None))
+    return windows
+
+
+def space_availability(
+    space, start=None, horizon_days=DEFAULT_HORIZON_DAYS, min_days=MIN_BOOKING_DAYS
+):
+    start = start or timezone.localdate()
+    end = start + timedelta(days=horizon_days)
+    booked = booked_intervals(space, start, end)
+    return {
+        "start": start,
+        "end": end,
+        "booked": booked,
+        "free": free_windows(booked, start, end, min_days),
+    }
+
+
+def next_free_window(availability, from_date, min_days=MIN_BOOKING_DAYS):
+    """First free window that still has ``min_days`` left on or after from_date."""
+    for window_start, window_end in availability["free"]:
+        window_start = max(window_start, from_date)
+        if window_end is None or (window_end - window_start).days + 1 >= min_days:
+            return window_start, window_end
+    return None
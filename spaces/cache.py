@@ -0,0 +1,90 @@
+"""Read-through cache for the browse pages.
+
+Cached values are keyed by the current version of the data they were built
+from: "catalog" (categories and spaces) and "bookings". Saving or deleting
+one of those models bumps its version, which orphans every key built from
+the old data instead of having to find and delete them.
+
+A version that is missing (never read, evicted or flushed) starts from the
+current time in microseconds rather than 1, so a value built before a cache
+flush never matches a version handed out after it.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f"spaces:version:{namespace}"
+
+
+def _initial_version():
+    return time.time_ns() // 1000
+
+
+def get_versions(*namespaces):
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return tuple(found[key] for key in keys)
+
+
+async def aget_versions(*namespaces):
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = await cache.aget_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in found}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        found.update(missing)
+    return tuple(found[key] for key in keys)
+
+
+def get_version(namespace):
+    return get_versions(namespace)[0]
+
+
+def bump_version(namespace):
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # never read yet, or evicted - any fresh value invalidates old keys
+        cache.add(key, _initial_version(), timeout=None)
+        return cache.incr(key)
+
+
+def _cache_key(name, versions):
+    return f"spaces:{name}:" + ".".join(str(version) for version in versions)
+
+
+def _timeout(timeout):
+    if timeout is None:
+        return getattr(settings, "SPACES_CACHE_TIMEOUT", 3600)
+    return timeout
+
+
+def cached(name, namespaces, build, timeout=None):
+    """Return the cached value of ``build()`` for the current data versions."""
+    key = _cache_key(name, get_versions(*namespaces))
+
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, _timeout(timeout))
+    return value
+
+
+async def acached(name, namespaces, build, timeout=None):
+    """Async variant of cached(); ``build`` is a coroutine function."""
+    key = _cache_key(name, await aget_versions(*namespaces))
+
+    value = await cache.aget(key)
+    if value is None:
+        value = await build()
+        await cache.aset(key, value, _timeout(timeout))
+    return value
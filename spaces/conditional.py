@@ -0,0 +1,149 @@
+"""Conditional GET and Cache-Control for the HTML browse pages.
+
+A page's ETag comes from the newest ``updated_at`` and the row count of
+the data it shows (the count catches deletes), cached per data version so
+an unchanged page costs no query to revalidate. It also folds in the day,
+since the pages show dates relative to today, the viewer, and the
+templates and static manifest of the running release.
+
+No Last-Modified is sent: a delete does not move the newest timestamp, so
+an If-Modified-Since revalidation would keep a stale page.
+
+Anonymous responses are public so a front cache can serve them; signed-in
+responses are private and revalidated on every use.
+"""
+
+import hashlib
+import os
+from functools import lru_cache, wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+
+from .cache import cached
+from .models import Booking, BusinessSpace, Category
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+
+@lru_cache(maxsize=1)
+def release_stamp():
+    """Newest mtime of the templates and the static manifest."""
+    paths = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(TEMPLATE_DIR)
+        for name in names
+    ]
+    paths.append(os.path.join(settings.STATIC_ROOT, "staticfiles.json"))
+    return max(os.path.getmtime(path) for path in paths if os.path.exists(path))
+
+
+def categories_stamp(request):
+    def load():
+        totals = Category.objects.aggregate(last=Max("updated_at"), count=Count("id"))
+        return [(totals["last"], totals["count"])]
+
+    return cached("stamp:categories", ["catalog"], load)
+
+
+def category_stamp(request, category):
+    def load():
+        # one pass over the category's spaces and (left joined) bookings
+        totals = BusinessSpace.objects.filter(category__category=category).aggregate(
+            category_last=Max("category__updated_at"),
+            space_last=Max("updated_at"),
+            spaces=Count("id", distinct=True),
+            booking_last=Max("booking__updated_at"),
+            bookings=Count("booking"),
+        )
+        return [
+            (totals["category_last"], 1),
+            (totals["space_last"], totals["spaces"]),
+            (totals["booking_last"], totals["bookings"]),
+        ]
+
+    return cached(f"stamp:category:{category}", ["catalog", "bookings"], load)
+
+
+def invoice_stamp(request, booking_id):
+    row = (
+        Booking.objects.filter(id=booking_id, user=request.user)
+        .values_list("updated_at", "space__updated_at", "space__category__updated_at")
+        .first()
+    )
+    return [(stamp, 1) for stamp in row] if row else None
+
+
+def _etag(request, stamps_func, args, kwargs):
+    stamps = stamps_func(request, *args, **kwargs)
+    if not stamps:
+        return None
+    today = timezone.localdate()
+    viewer = request.user.pk if request.user.is_authenticated else "anonymous"
+    seed = f"{request.get_full_path()}|{viewer}|{today}|{release_stamp()}|{stamps}"
+    return f'"{hashlib.sha1(seed.encode()).hexdigest()[:20]}"'
+
+
+def _cache_headers(request, response, etag):
+    if etag and response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+    # a message queued for the next page is stored in a cookie or the
+    # session, so the response is private to this browser
+    queued = getattr(messages.get_messages(request), "added_new", False)
+    if request.user.is_authenticated or queued:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.HTTP_CACHE_MAX_AGE,
+            s_maxage=settings.HTTP_CACHE_SHARED_MAX_AGE,
+        )
+    patch_vary_headers(response, ["Cookie"])
+    return response
+
+
+def conditional_page(stamps_func):
+    """Answer unchanged GETs with 304 before the view runs.
+
+    ``stamps_func(request, *args, **kwargs)`` returns the (updated_at,
+    count) pairs the page depends on, or None to skip validation.
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                request.user = await request.auser()
+                etag = await sync_to_async(_etag)(request, stamps_func, args, kwargs)
+                response = None
+                if etag and request.method in ("GET", "HEAD"):
+                    response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _cache_headers(request, response, etag)
+
+        else:
+
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                etag = _etag(request, stamps_func, args, kwargs)
+                response = None
+                if etag and request.method in ("GET", "HEAD"):
+                    response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _cache_headers(request, response, etag)
+
+        return wrapper
+
+    return decorator
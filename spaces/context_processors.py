@@ -0,0 +1,13 @@
+from django.conf import settings
+
+from .cache import get_versions
+
+
+def cache_versions(request):
+    """Data versions for keying {% cache %} fragments."""
+    catalog_version, booking_version = get_versions("catalog", "bookings")
+    return {
+        "catalog_version": catalog_version,
+        "booking_version": booking_version,
+        "fragment_cache_timeout": settings.SPACES_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,183 @@
+"""Streaming booking exports for accounting.
+
+Bookings are read with ``iterator(chunk_size=...)`` and written out one row
+(or one invoice) at a time, so memory use stays flat however many bookings
+match. The same generators back the admin actions, which stream through
+StreamingHttpResponse, and the ``export_bookings`` command, which writes
+them to a file.
+"""
+
+import csv
+import json
+import zipfile
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Booking
+from .pricing import booking_days
+
+EXPORT_CHUNK_SIZE = 2000
+# chunks pulled from the generator per thread hop when served over ASGI
+ASYNC_BATCH_SIZE = 100
+
+FIELDS = [
+    "invoice_number",
+    "invoice_date",
+    "booking_id",
+    "customer",
+    "email",
+    "space",
+    "category",
+    "from_date",
+    "to_date",
+    "days",
+    "total_cost",
+    "is_paid",
+]
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "zip": ("application/zip", "zip"),
+}
+
+
+def invoice_number(booking):
+    return f"INV-{booking.id:05d}"
+
+
+def invoice_context(booking):
+    return {
+        "booking": booking,
+        "space": booking.space,
+        "invoice_number": invoice_number(booking),
+        "invoice_date": booking.created_at,
+    }
+
+
+def export_queryset(bookings=None, from_date=None, to_date=None, paid=None):
+    """Bookings to export, oldest first, filtered by invoice date and paid.
+
+    ``from_date`` and ``to_date`` bound the invoice (creation) date,
+    inclusive; ``paid`` is True, False or None for both.
+    """
+    if bookings is None:
+        bookings = Booking.objects.all()
+    bookings = bookings.select_related("user", "space__category").order_by("id")
+    if from_date:
+        bookings = bookings.filter(created_at__date__gte=from_date)
+    if to_date:
+        bookings = bookings.filter(created_at__date__lte=to_date)
+    if paid is not None:
+        bookings = bookings.filter(is_paid=paid)
+    return bookings
+
+
+def booking_row(booking):
+    return {
+        "invoice_number": invoice_number(booking),
+        # the local date, as the created_at__date filters compare
+        "invoice_date": timezone.localdate(booking.created_at),
+        "booking_id": booking.id,
+        "customer": booking.user.username,
+        "email": booking.user.email,
+        "space": booking.space.name,
+        "category": booking.space.category.category,
+        "from_date": booking.from_date,
+        "to_date": booking.to_date,
+        "days": booking_days(booking.from_date, booking.to_date),
+        "total_cost": booking.total_cost,
+        "is_paid": booking.is_paid,
+    }
+
+
+class _Echo:
+    """File-like object whose write() hands the value back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_rows(bookings, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.DictWriter(_Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for booking in bookings.iterator(chunk_size=chunk_size):
+        yield writer.writerow(booking_row(booking))
+
+
+def jsonl_rows(bookings, chunk_size=EXPORT_CHUNK_SIZE):
+    for booking in bookings.iterator(chunk_size=chunk_size):
+        yield json.dumps(booking_row(booking), cls=DjangoJSONEncoder) + "\n"
+
+
+class _ZipStream:
+    """Write-only buffer that zipfile fills and the generator drains."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def invoice_zip(bookings, chunk_size=EXPORT_CHUNK_SIZE):
+    """A ZIP of rendered invoice.html pages, one file per booking."""
+    stream = _ZipStream()
+    # an unseekable target makes zipfile write each entry sequentially
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+        for booking in bookings.iterator(chunk_size=chunk_size):
+            archive.writestr(
+                f"{invoice_number(booking)}.html",
+                render_to_string("invoice.html", invoice_context(booking)),
+            )
+            yield stream.drain()
+    yield stream.drain()
+
+
+def export_rows(bookings, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    writers = {"csv": csv_rows, "jsonl": jsonl_rows, "zip": invoice_zip}
+    return writers[export_format](bookings, chunk_size)
+
+
+class ExportResponse(StreamingHttpResponse):
+    """StreamingHttpResponse that ASGI servers drain a batch at a time.
+
+    Given a synchronous iterator, Django's ASGI handler list()s all of it in
+    a thread before sending the first byte. The export generators run the
+    ORM, so they stay synchronous; under ASGI they are advanced
+    ASYNC_BATCH_SIZE chunks per ``sync_to_async`` call instead. WSGI
+    iterates them directly.
+    """
+
+    async def __aiter__(self):
+        parts = iter(self.streaming_content)
+        while batch := await sync_to_async(_next_batch)(parts, ASYNC_BATCH_SIZE):
+            for part in batch:
+                yield part
+
+
+def _next_batch(parts, size):
+    return list(islice(parts, size))
+
+
+def export_response(bookings, export_format, filename="bookings"):
+    content_type, extension = FORMATS[export_format]
+    response = ExportResponse(
+        export_rows(bookings, export_format), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
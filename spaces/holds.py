@@ -0,0 +1,169 @@
+"""Checkout reservation holds.
+
+Confirming a booking places a short-lived hold on the space's dates (or
+on time slots of one day, see spaces.slots); paying turns the hold into a
+Booking. Both steps lock the space row first, so the conflict check and
+the insert for one space never interleave between concurrent checkouts.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Booking, BusinessSpace, ReservationHold
+from .slots import past_mask, reserve, taken_mask
+
+JUST_BOOKED = "Sorry, this space was just booked by someone else!"
+
+
+class BookingConflict(Exception):
+    pass
+
+
+def hold_ttl():
+    return timedelta(minutes=getattr(settings, "RESERVATION_HOLD_MINUTES", 10))
+
+
+def sweep_expired_holds(space=None):
+    """Delete every expired hold (optionally of one space) in one statement."""
+    holds = ReservationHold.objects.expired()
+    if space is not None:
+        holds = holds.filter(space=space)
+    deleted, _ = holds.delete()
+    return deleted
+
+
+def _lock_space(space_id):
+    return BusinessSpace.objects.select_for_update().get(pk=space_id)
+
+
+def place_hold(user, space, from_date, to_date, total_cost):
+    sweep_expired_holds(space)
+
+    with transaction.atomic():
+        space = _lock_space(space.pk)
+
+        if not space.availability:
+            raise BookingConflict("This space is not available for rent")
+
+        conflicting = Booking.objects.overlapping(space, from_date, to_date).first()
+        if conflicting:
+            raise BookingConflict(
+                f"Space already booked from {conflicting.from_date} "
+                f"to {conflicting.to_date}"
+            )
+
+        # a hold can expire between the sweep and the lock
+        holds = ReservationHold.objects.overlapping(space, from_date, to_date)
+        if holds.active().exclude(user=user).exists():
+            raise BookingConflict(
+                "Someone is completing a booking for these dates, "
+                "please try again in a few minutes"
+            )
+
+        # a user re-confirming replaces their own earlier hold (and expired
+        # ones go too)
+        holds.delete()
+
+        return ReservationHold.objects.create(
+            user=user,
+            space=space,
+            from_date=from_date,
+            to_date=to_date,
+            total_cost=total_cost,
+            expires_at=timezone.now() + hold_ttl(),
+        )
+
+
+def place_slot_hold(user, space, day, mask, total_cost):
+    """Hold the time slots of ``mask`` on ``day``."""
+    sweep_expired_holds(space)
+
+    with transaction.atomic():
+        space = _lock_space(space.pk)
+
+        if not space.availability:
+            raise BookingConflict("This space is not available for rent")
+
+        if past_mask(day) & mask:
+            raise BookingConflict("Some of these time slots have already started")
+        if taken_mask(space, day) & mask:
+            raise BookingConflict("Some of these time slots are already booked")
+
+        # other users' whole-day holds on the day, or slot holds sharing a slot
+        holds = ReservationHold.objects.overlapping(space, day, day)
+        if (
+            holds.active()
+            .exclude(user=user)
+            .alias(clash=F("slot_mask").bitand(mask))
+            .filter(Q(slot_mask__isnull=True) | ~Q(clash=0))
+            .exists()
+        ):
+            raise BookingConflict(
+                "Someone is completing a booking for these time slots, "
+                "please try again in a few minutes"
+            )
+
+        holds.filter(user=user).delete()
+
+        return ReservationHold.objects.create(
+            user=user,
+            space=space,
+            from_date=day,
+            to_date=day,
+            slot_mask=mask,
+            total_cost=total_cost,
+            expires_at=timezone.now() + hold_ttl(),
+        )
+
+
+def _claim(hold):
+    """Check the hold's dates are still free, taking its slots if it has any."""
+    bookings = Booking.objects.overlapping(hold.space_id, hold.from_date, hold.to_date)
+    if hold.slot_mask is None:
+        return not bookings.exists()
+    return not bookings.filter(slot_mask__isnull=True).exists() and reserve(
+        hold.space_id, hold.from_date, hold.slot_mask
+    )
+
+
+def convert_hold(hold_id, user):
+    """Turn the user's hold into a paid booking.
+
+    The hold is consumed whatever the outcome.
+    """
+    booking = error = None
+    with transaction.atomic():
+        hold = ReservationHold.objects.filter(pk=hold_id, user=user).first()
+        if hold is None:
+            raise BookingConflict("Your reservation has expired, please book again")
+
+        _lock_space(hold.space_id)
+
+        if hold.expires_at <= timezone.now():
+            error = "Your reservation has expired, please book again"
+        else:
+            try:
+                with transaction.atomic():
+                    if not _claim(hold):
+                        raise BookingConflict(JUST_BOOKED)
+                    booking = Booking.objects.create(
+                        user=user,
+                        space_id=hold.space_id,
+                        from_date=hold.from_date,
+                        to_date=hold.to_date,
+                        slot_mask=hold.slot_mask,
+                        total_cost=hold.total_cost,
+                        is_paid=True,
+                    )
+            except (BookingConflict, IntegrityError):
+                error = JUST_BOOKED
+
+        hold.delete()
+
+    if error:
+        raise BookingConflict(error)
+    return booking
@@ -0,0 +1,285 @@
+"""Bulk booking imports from the legacy leasing system.
+
+Input rows (CSV or JSON Lines) carry ``space`` (id), ``user`` (username),
+``from_date``, ``to_date``, ``total_cost`` and optionally ``is_paid``. They
+are parsed as they stream in and grouped by space; each space is then
+swept once in ``from_date`` order against its existing bookings and the
+rows accepted before it, so no row costs an overlap query. Accepted rows
+are written in one transaction with ``COPY`` on Postgres and large
+``bulk_create`` batches elsewhere. Rejected rows come back with a reason.
+
+The database overlap constraint still guards the insert: a booking taken
+by a customer while the import runs makes it fail and roll back whole.
+"""
+
+import csv
+import json
+from collections import defaultdict, namedtuple
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Booking, BusinessSpace, DailyOccupancy
+from .rollups import occupancy_rows
+
+IMPORT_BATCH_SIZE = 5000
+# spaces (or usernames) per lookup query, below SQLite's variable limit
+LOOKUP_CHUNK_SIZE = 500
+FORMATS = ["csv", "jsonl"]
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+Row = namedtuple(
+    "Row", ["line", "space_id", "user", "from_date", "to_date", "cost", "paid"]
+)
+Rejected = namedtuple("Rejected", ["line", "reason", "data"])
+
+
+class ImportResult:
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.rejected = []
+
+
+def read_rows(file, import_format):
+    """(line number, dict) for every data row of a text file."""
+    if import_format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line, text in enumerate(file, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else {"_raw": text.rstrip("\n")}
+
+
+def parse_row(line, data):
+    """The Row for one input row; raises ValueError with the reason."""
+    if "_raw" in data:
+        raise ValueError("not a JSON object")
+    try:
+        space_id = int(data.get("space") or "")
+    except (TypeError, ValueError):
+        raise ValueError("invalid space")
+    username = str(data.get("user") or "").strip()
+    if not username:
+        raise ValueError("missing user")
+    try:
+        from_date = date.fromisoformat(str(data.get("from_date") or ""))
+        to_date = date.fromisoformat(str(data.get("to_date") or ""))
+    except ValueError:
+        raise ValueError("invalid dates, expected YYYY-MM-DD")
+    if to_date < from_date:
+        raise ValueError("to_date is before from_date")
+    try:
+        cost = Decimal(str(data.get("total_cost"))).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError("invalid total_cost")
+    if not cost.is_finite() or cost < 0 or cost.adjusted() >= 8:
+        raise ValueError("invalid total_cost")
+    paid = str(data.get("is_paid", "")).strip().lower() in TRUE_VALUES
+    return Row(line, space_id, username, from_date, to_date, cost, paid)
+
+
+def row_data(row):
+    return {
+        "space": row.space_id,
+        "user": row.user,
+        "from_date": row.from_date,
+        "to_date": row.to_date,
+        "total_cost": row.cost,
+        "is_paid": row.paid,
+    }
+
+
+def _chunks(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _user_ids(usernames):
+    ids = {}
+    for chunk in _chunks(usernames):
+        ids.update(
+            User.objects.filter(username__in=chunk).values_list("username", "id")
+        )
+    return ids
+
+
+def _existing(space_ids, since):
+    """space id -> [(from, to, booking id)] sorted by from_date."""
+    existing = defaultdict(list)
+    for chunk in _chunks(space_ids):
+        bookings = (
+            Booking.objects.filter(space_id__in=chunk, to_date__gte=since)
+            .order_by("space_id", "from_date")
+            .values_list("space_id", "from_date", "to_date", "id")
+        )
+        for space_id, from_date, to_date, booking_id in bookings.iterator():
+            existing[space_id].append((from_date, to_date, booking_id))
+    return existing
+
+
+def sweep(rows, existing):
+    """Split one space's rows into (accepted, [(row, reason)]).
+
+    Rows are taken in (from_date, line) order, so on overlapping rows the
+    earlier start wins and then the earlier line. ``busy_until`` is the last
+    day claimed by anything starting at or before the current row, so one
+    comparison covers those; the next existing booking covers the rest.
+    """
+    accepted, rejected = [], []
+    busy_until, busy_by = None, None
+    position = 0
+    for row in sorted(rows, key=lambda row: (row.from_date, row.line)):
+        while position < len(existing) and existing[position][0] <= row.from_date:
+            from_date, to_date, booking_id = existing[position]
+            if busy_until is None or to_date > busy_until:
+                busy_until, busy_by = to_date, f"booking {booking_id}"
+            position += 1
+        if busy_until is not None and busy_until >= row.from_date:
+            rejected.append((row, f"overlaps {busy_by}"))
+            continue
+        if position < len(existing) and existing[position][0] <= row.to_date:
+            rejected.append((row, f"overlaps booking {existing[position][2]}"))
+            continue
+        accepted.append(row)
+        busy_until, busy_by = row.to_date, f"line {row.line}"
+    return accepted, rejected
+
+
+def _copy(rows, user_ids, created_at):
+    columns = (
+        "user_id, space_id, from_date, to_date, total_cost, is_paid, "
+        "created_at, updated_at"
+    )
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(
+            f"COPY {Booking._meta.db_table} ({columns}) FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(
+                    (
+                        user_ids[row.user],
+                        row.space_id,
+                        row.from_date,
+                        row.to_date,
+                        row.cost,
+                        row.paid,
+                        created_at,
+                        created_at,
+                    )
+                )
+
+
+def _bulk_create(rows, user_ids, batch_size):
+    Booking.objects.bulk_create(
+        (
+            Booking(
+                user_id=user_ids[row.user],
+                space_id=row.space_id,
+                from_date=row.from_date,
+                to_date=row.to_date,
+                total_cost=row.cost,
+                is_paid=row.paid,
+            )
+            for row in rows
+        ),
+        batch_size=batch_size,
+    )
+
+
+def add_rollups(last_id, batch_size):
+    """Create the rollup rows of bookings after ``last_id`` that have none."""
+    bookings = (
+        Booking.objects.filter(id__gt=last_id)
+        .filter(~Exists(DailyOccupancy.objects.filter(booking=OuterRef("pk"))))
+        .select_related("space")
+        .order_by("id")
+    )
+    rows = []
+    for booking in bookings.iterator(chunk_size=batch_size):
+        rows.extend(occupancy_rows(booking, booking.space))
+        if len(rows) >= batch_size:
+            DailyOccupancy.objects.bulk_create(rows)
+            rows = []
+    DailyOccupancy.objects.bulk_create(rows)
+
+
+def import_bookings(file, import_format, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """Import bookings from an open text file; returns an ImportResult.
+
+    Model signals do not fire for bulk writes, so the rollups and the
+    "bookings" cache version are updated here.
+    """
+    result = ImportResult()
+    by_space = defaultdict(list)
+    for line, data in read_rows(file, import_format):
+        result.read += 1
+        try:
+            row = parse_row(line, data)
+        except ValueError as error:
+            result.rejected.append(Rejected(line, str(error), data))
+            continue
+        by_space[row.space_id].append(row)
+
+    space_ids = set(BusinessSpace.objects.values_list("id", flat=True))
+    for space_id in set(by_space) - space_ids:
+        result.rejected.extend(
+            Rejected(row.line, "unknown space", row_data(row))
+            for row in by_space.pop(space_id)
+        )
+    user_ids = _user_ids({row.user for rows in by_space.values() for row in rows})
+
+    accepted = []
+    if by_space:
+        since = min(row.from_date for rows in by_space.values() for row in rows)
+        existing = _existing(by_space, since)
+        for space_id, rows in by_space.items():
+            known = []
+            for row in rows:
+                if row.user in user_ids:
+                    known.append(row)
+                else:
+                    result.rejected.append(
+                        Rejected(row.line, "unknown user", row_data(row))
+                    )
+            kept, conflicts = sweep(known, existing.get(space_id, []))
+            accepted.extend(kept)
+            result.rejected.extend(
+                Rejected(row.line, reason, row_data(row)) for row, reason in conflicts
+            )
+    result.rejected.sort(key=lambda rejected: rejected.line)
+    result.imported = len(accepted)
+    if dry_run or not accepted:
+        return result
+
+    with transaction.atomic():
+        last_id = Booking.objects.order_by("-id").values_list("id", flat=True).first()
+        if connection.vendor == "postgresql":
+            _copy(accepted, user_ids, timezone.now())
+        else:
+            _bulk_create(accepted, user_ids, batch_size)
+        add_rollups(last_id or 0, batch_size)
+        transaction.on_commit(partial(bump_version, "bookings"))
+    return result
+
+
+def write_report(rejected, file):
+    """Write rejected rows as CSV: line, reason and the row as JSON."""
+    writer = csv.writer(file)
+    writer.writerow(["line", "reason", "row"])
+    for line, reason, data in rejected:
+        writer.writerow([line, reason, json.dumps(data, default=str)])
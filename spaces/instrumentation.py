@@ -0,0 +1,256 @@
+"""Per-request timing: wall time, SQL and template rendering.
+
+``InstrumentationMiddleware`` (see spaces.middleware) opens a RequestTiming
+for each request in a context variable. Context variables follow the
+request into ``sync_to_async`` threads, so the SQL timer (an execute
+wrapper installed on every database connection) and the template backend
+below add to the right request under WSGI and ASGI alike, and do nothing
+outside one. Finished requests are folded into per-URL-name totals that
+``prometheus_text`` renders for the metrics endpoint.
+
+Totals live in process memory: each worker reports its own requests.
+"""
+
+import heapq
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as DjangoTemplate
+
+from .dbpool import pool_stats
+
+# upper bounds (seconds) of the request duration histogram
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_current = ContextVar("spaces_request_timing", default=None)
+
+
+class RequestTiming:
+    def __init__(self, top_queries):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.top_queries = top_queries
+        # min-heap of (ms, sequence, sql), the slowest top_queries survive
+        self.queries = []
+
+    def add_query(self, sql, ms):
+        self.sql_count += 1
+        self.sql_ms += ms
+        entry = (ms, self.sql_count, sql)
+        if len(self.queries) < self.top_queries:
+            heapq.heappush(self.queries, entry)
+        elif ms > self.queries[0][0]:
+            heapq.heapreplace(self.queries, entry)
+
+    def slowest(self):
+        return [
+            {"ms": round(ms, 2), "sql": sql}
+            for ms, _, sql in sorted(self.queries, reverse=True)
+        ]
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start():
+    timing = RequestTiming(getattr(settings, "INSTRUMENTATION_TOP_QUERIES", 5))
+    return timing, _current.set(timing)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def sql_timer(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    began = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(sql, (time.perf_counter() - began) * 1000)
+
+
+def install_sql_timer(connection, **kwargs):
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
+
+
+def install_on_open_connections():
+    for connection in connections.all(initialized_only=True):
+        install_sql_timer(connection)
+
+
+class Template(DjangoTemplate):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None:
+            return super().render(context, request)
+        began = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_ms += (time.perf_counter() - began) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing each top-level render."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return Template(template.template, self)
+
+
+def server_timing(timing, total_ms):
+    return (
+        f'sql;dur={timing.sql_ms:.1f};desc="{timing.sql_count} queries", '
+        f"tpl;dur={timing.template_ms:.1f}, total;dur={total_ms:.1f}"
+    )
+
+
+class _Route:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+
+_routes = {}
+_lock = threading.Lock()
+
+
+def record(name, status, timing, total_ms):
+    seconds = total_ms / 1000
+    with _lock:
+        route = _routes.get(name)
+        if route is None:
+            route = _routes[name] = _Route()
+        route.requests += 1
+        route.errors += status >= 500
+        route.seconds += seconds
+        route.sql_count += timing.sql_count
+        route.sql_seconds += timing.sql_ms / 1000
+        route.template_seconds += timing.template_ms / 1000
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                route.buckets[index] += 1
+                break
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+
+
+def _label(value):
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return value.replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Per-URL-name totals and pool gauges in the Prometheus text format."""
+    with _lock:
+        routes = sorted((name, vars(route).copy()) for name, route in _routes.items())
+
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+
+    def per_route(metric, field):
+        return [
+            f'{metric}{{view="{_label(name)}"}} {route[field]}'
+            for name, route in routes
+        ]
+
+    histogram = []
+    for name, route in routes:
+        view = _label(name)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, route["buckets"]):
+            cumulative += count
+            histogram.append(
+                f'spaces_request_duration_seconds_bucket{{view="{view}",le="{bound}"}}'
+                f" {cumulative}"
+            )
+        histogram.append(
+            f'spaces_request_duration_seconds_bucket{{view="{view}",le="+Inf"}}'
+            f" {route['requests']}"
+        )
+        histogram.append(
+            f'spaces_request_duration_seconds_sum{{view="{view}"}} {route["seconds"]}'
+        )
+        histogram.append(
+            f'spaces_request_duration_seconds_count{{view="{view}"}}'
+            f" {route['requests']}"
+        )
+    family(
+        "spaces_request_duration_seconds",
+        "histogram",
+        "Request wall time by URL name.",
+        histogram,
+    )
+    family(
+        "spaces_request_errors_total",
+        "counter",
+        "Responses with a 5xx status by URL name.",
+        per_route("spaces_request_errors_total", "errors"),
+    )
+    family(
+        "spaces_request_queries_total",
+        "counter",
+        "SQL queries run by URL name.",
+        per_route("spaces_request_queries_total", "sql_count"),
+    )
+    family(
+        "spaces_request_query_seconds_total",
+        "counter",
+        "Time spent in SQL by URL name.",
+        per_route("spaces_request_query_seconds_total", "sql_seconds"),
+    )
+    family(
+        "spaces_request_template_seconds_total",
+        "counter",
+        "Time spent rendering templates by URL name.",
+        per_route("spaces_request_template_seconds_total", "template_seconds"),
+    )
+
+    stats = pool_stats()
+    if stats is not None:
+        for key in ["size", "active", "idle", "waiting"]:
+            family(
+                f"spaces_db_pool_{key}",
+                "gauge",
+                f"Database pool connections: {key}.",
+                [f"spaces_db_pool_{key} {stats[key]}"],
+            )
+        for key in ["requests", "errors", "connections_opened"]:
+            family(
+                f"spaces_db_pool_{key}_total",
+                "counter",
+                f"Database pool {key.replace('_', ' ')}.",
+                [f"spaces_db_pool_{key}_total {stats[key]}"],
+            )
+        family(
+            "spaces_db_pool_wait_seconds_total",
+            "counter",
+            "Time requests waited for a pooled connection.",
+            [f"spaces_db_pool_wait_seconds_total {stats['wait_ms_total'] / 1000}"],
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,92 @@
+"""Cached querysets behind the browse pages."""
+
+from .cache import acached, cached
+from .models import BusinessSpace, Category
+
+SPACES_PAGE_SIZE = 24
+
+
+def _page_query(queryset, after):
+    return queryset.filter(id__gt=after).order_by("id")[: SPACES_PAGE_SIZE + 1]
+
+
+def _split_page(spaces):
+    next_after = None
+    if len(spaces) > SPACES_PAGE_SIZE:
+        spaces = spaces[:SPACES_PAGE_SIZE]
+        next_after = spaces[-1].id
+    return spaces, next_after
+
+
+def space_page(queryset, after):
+    """Keyset pagination - the page of spaces after the last id seen."""
+    return _split_page(list(_page_query(queryset, after)))
+
+
+async def aspace_page(queryset, after):
+    return _split_page([space async for space in _page_query(queryset, after)])
+
+
+def categories():
+    return cached("categories", ["catalog"], lambda: list(Category.objects.all()))
+
+
+async def acategories():
+    async def load():
+        return [category async for category in Category.objects.all()]
+
+    return await acached("categories", ["catalog"], load)
+
+
+def category_codes():
+    return cached(
+        "category_codes",
+        ["catalog"],
+        lambda: set(Category.objects.values_list("category", flat=True)),
+    )
+
+
+async def acategory_codes():
+    async def load():
+        codes = Category.objects.values_list("category", flat=True)
+        return {code async for code in codes}
+
+    return await acached("category_codes", ["catalog"], load)
+
+
+def _listing_query(category, search):
+    business_spaces = (
+        BusinessSpace.objects.filter(category__category=category)
+        .select_related("category")
+        .with_booked_till()
+    )
+    if search:
+        business_spaces = business_spaces.free_between(*search)
+    return business_spaces
+
+
+def _listing_name(category, after, search):
+    dates = "-".join(day.isoformat() for day in search) if search else "all"
+    return f"listing:{category}:{after}:{dates}"
+
+
+def category_listing(category, after=0, search=None):
+    """A page of a category's spaces, annotated with booked_till.
+
+    ``search`` is an optional (from_date, to_date) pair restricting the page
+    to spaces free over those dates.
+    """
+    return cached(
+        _listing_name(category, after, search),
+        ["catalog", "bookings"],
+        lambda: space_page(_listing_query(category, search), after),
+    )
+
+
+async def acategory_listing(category, after=0, search=None):
+    async def load():
+        return await aspace_page(_listing_query(category, search), after)
+
+    return await acached(
+        _listing_name(category, after, search), ["catalog", "bookings"], load
+    )
@@ -0,0 +1,123 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+
+from spaces.models import Booking, BusinessSpace, Category
+
+BOOKINGS_PER_SPACE = 10_000
+EPOCH = date(2000, 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time booking conflict lookups at several table sizes. Data is seeded "
+        "inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10_000, 1_000_000],
+            help="Total number of bookings to seed for each run.",
+        )
+        parser.add_argument(
+            "--lookups",
+            type=int,
+            default=1000,
+            help="Number of conflict lookups to time per run.",
+        )
+
+    def handle(self, *args, **options):
+        for size in options["sizes"]:
+            with transaction.atomic():
+                spaces = self.seed(size)
+                lookup = self.time_lookups(spaces, options["lookups"])
+                rejected = self.check_rejection(spaces[0])
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f"{size:>9} bookings: "
+                f"p50={lookup['p50']:.3f}ms p99={lookup['p99']:.3f}ms "
+                f"overlap rejected by database: {rejected}"
+            )
+
+    def seed(self, size):
+        user = User.objects.create_user(username="bench-conflicts")
+        category = Category.objects.create(
+            category="SHOP_S", description="bench", cost_per_unit=Decimal("1.00")
+        )
+        space_count = max(1, size // BOOKINGS_PER_SPACE)
+        spaces = BusinessSpace.objects.bulk_create(
+            BusinessSpace(
+                category=category,
+                name=f"Bench {i}",
+                description="bench",
+                duration_type="All Days",
+                rent_type="Day Wise",
+                cost=Decimal("1.00"),
+            )
+            for i in range(space_count)
+        )
+        per_space = size // space_count
+
+        # back-to-back three day bookings with a one day gap between them
+        batch = []
+        for space in spaces:
+            for i in range(per_space):
+                start = EPOCH + timedelta(days=i * 4)
+                batch.append(
+                    Booking(
+                        user=user,
+                        space=space,
+                        from_date=start,
+                        to_date=start + timedelta(days=2),
+                        total_cost=Decimal("3.00"),
+                        is_paid=True,
+                    )
+                )
+                if len(batch) >= 5000:
+                    Booking.objects.bulk_create(batch)
+                    batch = []
+        Booking.objects.bulk_create(batch)
+        return spaces
+
+    def time_lookups(self, spaces, lookups):
+        per_space = Booking.objects.filter(space=spaces[0]).count()
+        timings = []
+        for _ in range(lookups):
+            space = random.choice(spaces)
+            start = EPOCH + timedelta(days=random.randrange(per_space * 4))
+            began = time.perf_counter()
+            Booking.objects.overlapping(
+                space, start, start + timedelta(days=1)
+            ).exists()
+            timings.append((time.perf_counter() - began) * 1000)
+
+        timings.sort()
+        return {
+            "p50": statistics.median(timings),
+            "p99": timings[int(len(timings) * 0.99) - 1],
+        }
+
+    def check_rejection(self, space):
+        existing = Booking.objects.filter(space=space).first()
+        try:
+            with transaction.atomic():
+                Booking.objects.create(
+                    user=existing.user,
+                    space=space,
+                    from_date=existing.to_date,
+                    to_date=existing.to_date + timedelta(days=1),
+                    total_cost=Decimal("2.00"),
+                )
+        except IntegrityError:
+            return True
+        return False
@@ -0,0 +1,114 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from spaces.dbpool import pool_stats
+from spaces.models import Category
+
+MODES = ("direct", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare request latency against PostgreSQL with a new connection "
+        "per request, persistent connections and a connection pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=MODES,
+            default=list(MODES),
+            help="Connection strategies to measure.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Simulated requests per mode.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Threads issuing requests at the same time.",
+        )
+        parser.add_argument(
+            "--pool-size",
+            type=int,
+            default=4,
+            help="max_size of the pool in pool mode.",
+        )
+
+    def handle(self, *args, **options):
+        base = connections.settings["default"]
+        if connections["default"].vendor != "postgresql":
+            raise CommandError("bench_db needs the PostgreSQL backend.")
+
+        for mode in options["modes"]:
+            alias = f"bench_{mode}"
+            connections.settings[alias] = self.mode_settings(
+                base, mode, options["pool_size"]
+            )
+            try:
+                latencies, elapsed = self.run(
+                    alias, options["requests"], options["concurrency"]
+                )
+                self.report(mode, latencies, elapsed, pool_stats(alias))
+            finally:
+                connections[alias].close()
+                if mode == "pool":
+                    connections[alias].close_pool()
+                del connections[alias]
+                del connections.settings[alias]
+
+    def mode_settings(self, base, mode, pool_size):
+        options = {
+            key: value for key, value in base["OPTIONS"].items() if key != "pool"
+        }
+        settings = {**base, "OPTIONS": options, "CONN_MAX_AGE": 0}
+        if mode == "persistent":
+            settings["CONN_MAX_AGE"] = None
+        elif mode == "pool":
+            options["pool"] = {"min_size": pool_size, "max_size": pool_size}
+        return settings
+
+    def run(self, alias, total, concurrency):
+        def request():
+            # what a request does: one small query, then the
+            # request_finished cleanup
+            began = time.perf_counter()
+            list(Category.objects.using(alias).all())
+            connections[alias].close_if_unusable_or_obsolete()
+            return (time.perf_counter() - began) * 1000
+
+        def worker(count):
+            try:
+                return [request() for _ in range(count)]
+            finally:
+                connections[alias].close()
+
+        shares = [total // concurrency] * concurrency
+        shares[0] += total % concurrency
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            began = time.perf_counter()
+            results = list(pool.map(worker, shares))
+            elapsed = time.perf_counter() - began
+        return sorted(latency for part in results for latency in part), elapsed
+
+    def report(self, mode, latencies, elapsed, stats):
+        line = (
+            f"{mode:>10}: {len(latencies) / elapsed:.1f} req/s "
+            f"p50={statistics.median(latencies):.2f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1]:.2f}ms"
+        )
+        if stats:
+            line += (
+                f" pool wait avg={stats['wait_ms_avg']:.2f}ms "
+                f"opened={stats['connections_opened']}"
+            )
+        self.stdout.write(line)
@@ -0,0 +1,80 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent GET requests to a running server and report "
+        "throughput and latency, e.g. to compare runserver with gunicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the server under test.",
+        )
+        parser.add_argument(
+            "--paths",
+            nargs="+",
+            default=["/", "/rentals/"],
+            help="Paths requested in turn by every client.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            nargs="+",
+            type=int,
+            default=[1, 8, 32],
+            help="Number of concurrent clients for each run.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests sent per run.",
+        )
+
+    def handle(self, *args, **options):
+        base = options["url"].rstrip("/")
+        urls = [base + path for path in options["paths"]]
+
+        _, ok = self.fetch(urls[0])
+        if not ok:
+            raise CommandError(f"Cannot reach {urls[0]}")
+
+        for clients in options["concurrency"]:
+            total = options["requests"]
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                began = time.perf_counter()
+                results = list(
+                    pool.map(self.fetch, (urls[i % len(urls)] for i in range(total)))
+                )
+                elapsed = time.perf_counter() - began
+
+            latencies = sorted(latency for latency, ok in results if ok)
+            errors = total - len(latencies)
+            if not latencies:
+                self.stdout.write(f"{clients:>4} clients: all {total} requests failed")
+                continue
+
+            self.stdout.write(
+                f"{clients:>4} clients: {total / elapsed:.1f} req/s "
+                f"p50={statistics.median(latencies):.1f}ms "
+                f"p99={latencies[int(len(latencies) * 0.99) - 1]:.1f}ms "
+                f"errors={errors}"
+            )
+
+    def fetch(self, url):
+        began = time.perf_counter()
+        try:
+            with urlopen(url, timeout=30) as response:
+                response.read()
+                ok = response.status < 500
+        except URLError:
+            ok = False
+        return (time.perf_counter() - began) * 1000, ok
@@ -0,0 +1,81 @@
+import statistics
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from spaces.models import BusinessSpace, Category
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering of the space listing page with a cold and a warm "
+        "card fragment cache. No database access is needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cards",
+            nargs="+",
+            type=int,
+            default=[50, 500, 5000],
+            help="Number of cards to render on the page for each run.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Warm renders to time per run.",
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/rentals/SHOP_S/")
+        request.user = AnonymousUser()
+
+        for cards in options["cards"]:
+            context = {
+                "businessSpace": self.spaces(cards),
+                "category": "SHOP_S",
+            }
+
+            cache.clear()
+            began = time.perf_counter()
+            render_to_string("products/index.html", context, request=request)
+            cold = (time.perf_counter() - began) * 1000
+
+            warm = []
+            for _ in range(options["repeat"]):
+                began = time.perf_counter()
+                render_to_string("products/index.html", context, request=request)
+                warm.append((time.perf_counter() - began) * 1000)
+
+            self.stdout.write(
+                f"{cards:>6} cards: cold={cold:.1f}ms "
+                f"warm={statistics.median(warm):.1f}ms per page"
+            )
+
+    def spaces(self, count):
+        category = Category(
+            id=1, category="SHOP_S", description="bench", cost_per_unit=Decimal("1")
+        )
+        spaces = []
+        for i in range(count):
+            space = BusinessSpace(
+                id=i + 1,
+                category=category,
+                name=f"Shop {i}",
+                description="A well lit shop on the ground floor",
+                duration_type="All Days",
+                rent_type="Day Wise",
+                cost=Decimal("500.00"),
+                image="uploads/shop101.webp",
+            )
+            space.status = "available"
+            space.available_from = date.today()
+            spaces.append(space)
+        return spaces
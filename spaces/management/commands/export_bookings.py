@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from spaces.exports import EXPORT_CHUNK_SIZE, FORMATS, export_queryset, export_rows
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream bookings as CSV or JSON Lines, or their invoices as a ZIP, "
+        "filtered by invoice date and paid status."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=sorted(FORMATS), default="csv", dest="export_format"
+        )
+        parser.add_argument(
+            "--from", dest="from_date", type=parse_date, help="First invoice date."
+        )
+        parser.add_argument(
+            "--to", dest="to_date", type=parse_date, help="Last invoice date."
+        )
+        paid = parser.add_mutually_exclusive_group()
+        paid.add_argument("--paid", dest="paid", action="store_const", const=True)
+        paid.add_argument("--unpaid", dest="paid", action="store_const", const=False)
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="File to write; defaults to standard output (not for zip).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        export_format = options["export_format"]
+        bookings = export_queryset(
+            from_date=options["from_date"],
+            to_date=options["to_date"],
+            paid=options["paid"],
+        )
+        rows = export_rows(bookings, export_format, options["chunk_size"])
+
+        if not options["output"]:
+            if export_format == "zip":
+                raise CommandError("--output is required for the zip format")
+            for row in rows:
+                self.stdout.write(row, ending="")
+            return
+
+        if export_format == "zip":
+            target = open(options["output"], "wb")
+        else:
+            target = open(options["output"], "w", encoding="utf-8", newline="")
+        with target:
+            for row in rows:
+                target.write(row)
+        self.stderr.write(f"Wrote {options['output']}")
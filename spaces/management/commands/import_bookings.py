@@ -0,0 +1,71 @@
+import io
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from spaces.imports import FORMATS, IMPORT_BATCH_SIZE, import_bookings, write_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Import bookings from a CSV or JSON Lines file (columns space, user, "
+        "from_date, to_date, total_cost, is_paid). Rows that overlap existing "
+        "bookings or earlier rows are rejected and can be written to a report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or - for standard input.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            dest="import_format",
+            help="Defaults to the file extension.",
+        )
+        parser.add_argument("--report", help="Write rejected rows to this CSV file.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Check the file without writing any booking.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["import_format"]
+        if not import_format:
+            import_format = path.rsplit(".", 1)[-1].lower()
+            if import_format not in FORMATS:
+                raise CommandError("Cannot tell the format, pass --format")
+
+        if path == "-":
+            source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        else:
+            try:
+                source = open(path, encoding="utf-8", newline="")
+            except OSError as error:
+                raise CommandError(f"Cannot read {path}: {error}")
+
+        began = time.perf_counter()
+        with source:
+            result = import_bookings(
+                source,
+                import_format,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8", newline="") as file:
+                write_report(result.rejected, file)
+
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            f"{verb} {result.imported} of {result.read} row(s), rejected "
+            f"{len(result.rejected)}, in {time.perf_counter() - began:.1f}s"
+        )
+        if result.rejected and not options["report"]:
+            for rejected in result.rejected[:10]:
+                self.stderr.write(f"line {rejected.line}: {rejected.reason}")
+            if len(result.rejected) > 10:
+                self.stderr.write("... pass --report to see every rejected row")
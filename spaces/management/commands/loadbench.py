@@ -0,0 +1,353 @@
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from spaces.models import Booking, BusinessSpace, Category
+
+CATEGORY_CODES = [code for code, _ in Category.SPACE_CATEGORIES]
+# seeded bookings are three day stays with a one day gap
+BOOKING_STRIDE = 4
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic mall in a throwaway test database and drive the "
+        "browse, booking and checkout URLs with concurrent clients. Reports "
+        "p50/p95/p99 latency, throughput and SQL queries per route, and can "
+        "save the results as JSON to compare runs across commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=5)
+        parser.add_argument(
+            "--spaces", type=int, default=200, help="Spaces in the whole mall."
+        )
+        parser.add_argument(
+            "--bookings", type=int, default=20, help="Bookings per space."
+        )
+        parser.add_argument(
+            "--clients", type=int, default=8, help="Concurrent clients."
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=25,
+            help="Requests per client for each route.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline", help="Earlier JSON results to print p50 changes against."
+        )
+        parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as file:
+                    baseline = json.load(file)["routes"]
+            except (OSError, ValueError, KeyError) as error:
+                raise CommandError(f"Cannot read baseline: {error}")
+
+        test_settings = connection.settings_dict["TEST"]
+        if connection.vendor == "sqlite" and not test_settings["NAME"]:
+            # the default in-memory test database locks whole tables under
+            # concurrent clients; use a file, and take the write lock when a
+            # transaction starts so concurrent writers wait instead of failing
+            test_settings["NAME"] = os.path.join(
+                tempfile.gettempdir(), "loadbench.sqlite3"
+            )
+            connection.settings_dict["OPTIONS"].update(
+                transaction_mode="IMMEDIATE", timeout=30
+            )
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            random.seed(options["seed"])
+            began = time.perf_counter()
+            mall = self.seed_mall(options)
+            seeded = time.perf_counter() - began
+            self.stdout.write(
+                f"Seeded {len(mall['spaces'])} spaces and "
+                f"{len(mall['spaces']) * options['bookings']} bookings "
+                f"in {seeded:.1f}s ({connection.vendor})"
+            )
+            routes = self.run(mall, options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(routes, baseline)
+        if options["output"]:
+            results = {
+                "commit": self.commit(),
+                "created_at": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "config": {
+                    key: options[key]
+                    for key in [
+                        "categories",
+                        "spaces",
+                        "bookings",
+                        "clients",
+                        "requests",
+                        "seed",
+                    ]
+                },
+                "routes": routes,
+            }
+            with open(options["output"], "w") as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(f"Saved results to {options['output']}")
+
+    def seed_mall(self, options):
+        codes = [
+            CATEGORY_CODES[i] if i < len(CATEGORY_CODES) else f"CAT_{i}"
+            for i in range(options["categories"])
+        ]
+        categories = Category.objects.bulk_create(
+            Category(category=code, description=code, cost_per_unit=Decimal("100"))
+            for code in codes
+        )
+        spaces = BusinessSpace.objects.bulk_create(
+            BusinessSpace(
+                category=categories[i % len(categories)],
+                name=f"Space {i}",
+                description="Synthetic space",
+                duration_type=random.choice(["All Days", "Week Days", "Week Ends"]),
+                rent_type=random.choice(["Day Wise", "Week Wise", "SqFt"]),
+                cost=Decimal(random.randint(0, 20) * 100),
+            )
+            for i in range(options["spaces"])
+        )
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            User(username=f"client{i}", password=password)
+            for i in range(options["clients"])
+        )
+
+        start = date.today() - timedelta(days=BOOKING_STRIDE * options["bookings"] // 2)
+        batch = []
+        for space in spaces:
+            for i in range(options["bookings"]):
+                from_date = start + timedelta(days=i * BOOKING_STRIDE)
+                batch.append(
+                    Booking(
+                        user=users[(space.id + i) % len(users)],
+                        space=space,
+                        from_date=from_date,
+                        to_date=from_date + timedelta(days=2),
+                        total_cost=Decimal("300.00"),
+                        is_paid=True,
+                    )
+                )
+            if len(batch) >= 5000:
+                Booking.objects.bulk_create(batch)
+                batch = []
+        Booking.objects.bulk_create(batch)
+
+        return {
+            "codes": codes,
+            "spaces": [space.id for space in spaces],
+            "users": users,
+            "bookings": {
+                user.id: list(
+                    Booking.objects.filter(user=user).values_list("id", flat=True)[:100]
+                )
+                for user in users
+            },
+            # checkout dates start after every seeded booking has ended
+            "free_from": start
+            + timedelta(days=BOOKING_STRIDE * options["bookings"] + 30),
+        }
+
+    def run(self, mall, options):
+        clients = options["clients"]
+        requests = options["requests"]
+        samples = {}
+        lock = threading.Lock()
+
+        def timed(route, send):
+            counter = QueryCounter()
+            began = time.perf_counter()
+            try:
+                with connection.execute_wrapper(counter):
+                    response = send()
+                ok = response.status_code < 400
+            except Exception:
+                response, ok = None, False
+            elapsed = (time.perf_counter() - began) * 1000
+            with lock:
+                samples.setdefault(route, []).append((elapsed, counter.count, ok))
+            return response
+
+        def client_for(index):
+            client = Client()
+            client.force_login(mall["users"][index])
+            return client
+
+        def browse(index):
+            client = client_for(index)
+            for _ in range(requests):
+                code = random.choice(mall["codes"])
+                space = random.choice(mall["spaces"])
+                timed("rentals", lambda: client.get(reverse("rentals")))
+                timed(
+                    "rentals_category",
+                    lambda: client.get(reverse("rentals_category", args=[code])),
+                )
+                timed(
+                    "booking_check", lambda: self.post_booking(client, space, "check")
+                )
+
+        def checkout(index):
+            client = client_for(index)
+            for i in range(requests):
+                space = mall["spaces"][(index * requests + i) % len(mall["spaces"])]
+                offset = (index * requests + i) // len(mall["spaces"])
+                from_date = mall["free_from"] + timedelta(days=offset * BOOKING_STRIDE)
+                timed(
+                    "booking_confirm",
+                    lambda: self.post_booking(client, space, "confirm", from_date),
+                )
+                timed("payment_new", lambda: client.get(reverse("payment_new")))
+                timed(
+                    "process_payment",
+                    lambda: client.post(reverse("process_payment")),
+                )
+
+        def account(index):
+            client = client_for(index)
+            booking_ids = mall["bookings"][mall["users"][index].id]
+            for _ in range(requests):
+                timed("my_bookings", lambda: client.get(reverse("my_bookings")))
+                if booking_ids:
+                    booking_id = random.choice(booking_ids)
+                    timed(
+                        "invoice",
+                        lambda: client.get(reverse("invoice", args=[booking_id])),
+                    )
+
+        phases = {}
+        for phase, work in [
+            ("browse", browse),
+            ("checkout", checkout),
+            ("account", account),
+        ]:
+            cache.clear()
+            began = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                list(pool.map(self.in_thread(work), range(clients)))
+            phases[phase] = time.perf_counter() - began
+
+        phase_of = {
+            "rentals": "browse",
+            "rentals_category": "browse",
+            "booking_check": "browse",
+            "booking_confirm": "checkout",
+            "payment_new": "checkout",
+            "process_payment": "checkout",
+            "my_bookings": "account",
+            "invoice": "account",
+        }
+        return {
+            route: self.summarise(samples[route], phases[phase_of[route]])
+            for route in phase_of
+            if route in samples
+        }
+
+    def in_thread(self, work):
+        def run(index):
+            try:
+                work(index)
+            finally:
+                connections.close_all()
+
+        return run
+
+    def post_booking(self, client, space_id, action, from_date=None):
+        from_date = from_date or date.today() + timedelta(days=random.randint(1, 60))
+        return client.post(
+            reverse("booking", args=[space_id]),
+            {
+                "action": action,
+                "from_date": from_date.isoformat(),
+                "to_date": (from_date + timedelta(days=2)).isoformat(),
+            },
+        )
+
+    def summarise(self, samples, phase_seconds):
+        latencies = sorted(latency for latency, _, _ in samples)
+        queries = [count for _, count, _ in samples]
+
+        def percentile(fraction):
+            return round(latencies[max(int(len(latencies) * fraction) - 1, 0)], 2)
+
+        return {
+            "requests": len(samples),
+            "errors": sum(1 for _, _, ok in samples if not ok),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "throughput_rps": round(len(samples) / phase_seconds, 1),
+            "queries_avg": round(statistics.mean(queries), 1),
+            "queries_max": max(queries),
+        }
+
+    def report(self, routes, baseline):
+        self.stdout.write(
+            f"{'route':<18}{'reqs':>6}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}"
+            f"{'req/s':>8}{'sql':>6}"
+        )
+        for route, row in routes.items():
+            line = (
+                f"{route:<18}{row['requests']:>6}{row['errors']:>5}"
+                f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+                f"{row['throughput_rps']:>8.1f}{row['queries_max']:>6}"
+            )
+            if baseline and route in baseline and baseline[route]["p50_ms"]:
+                change = row["p50_ms"] / baseline[route]["p50_ms"] * 100 - 100
+                line += f"  p50 {change:+.0f}%"
+            self.stdout.write(line)
+
+    def commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from spaces.cache import bump_version
+from spaces.models import BusinessSpace
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing space images to content-hash names, so duplicate "
+        "uploads share one file, and generate their WebP variants. The old "
+        "files are left in place."
+    )
+
+    def handle(self, *args, **options):
+        moved = 0
+        spaces = BusinessSpace.objects.exclude(image="").exclude(image__isnull=True)
+        for space in spaces.only("id", "image").iterator(chunk_size=500):
+            storage = space.image.storage
+            if not storage.exists(space.image.name):
+                self.stderr.write(f"Missing file for space {space.id}: {space.image}")
+                continue
+
+            with storage.open(space.image.name) as content:
+                name = storage.save(space.image.name, content)
+            if name != space.image.name:
+                # update() does not apply auto_now
+                BusinessSpace.objects.filter(pk=space.pk).update(
+                    image=name, updated_at=timezone.now()
+                )
+                moved += 1
+
+        if moved:
+            # update() skips the signals that invalidate cached listings
+            bump_version("catalog")
+        self.stdout.write(f"Renamed {moved} image(s)")
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from spaces.rollups import REBUILD_CHUNK_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the daily occupancy rollup from every booking, e.g. after "
+        "bulk imports that bypass model signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=REBUILD_CHUNK_SIZE,
+            help="Bookings read and rollup rows inserted per batch.",
+        )
+
+    def handle(self, *args, **options):
+        began = time.perf_counter()
+        created = rebuild(options["chunk_size"])
+        self.stdout.write(
+            f"Wrote {created} rollup row(s) in {time.perf_counter() - began:.1f}s"
+        )
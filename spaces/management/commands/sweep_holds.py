@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from spaces.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Delete expired checkout reservation holds in bulk."
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired_holds()
+        self.stdout.write(f"Deleted {deleted} expired hold(s)")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from spaces.conditional import categories_stamp, category_stamp
+from spaces.listings import categories, category_codes, category_listing
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the browse page cache after a deploy. Only useful with a cache "
+        "shared between processes (CACHE_BACKEND=file)."
+    )
+
+    def handle(self, *args, **options):
+        categories()
+        categories_stamp(None)
+        for category in category_codes():
+            spaces, _ = category_listing(category)
+            category_stamp(None, category)
+            self.stdout.write(f"{category}: {len(spaces)} space(s) cached")
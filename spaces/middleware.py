@@ -0,0 +1,228 @@
+import json
+import logging
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.backends.signals import connection_created
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import instrumentation
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# manifest hashed static names (style.1a2b3c4d5e6f.css) and content-hash
+# uploads never change once written
+IMMUTABLE_RE = re.compile(r"\.[0-9a-f]{12}\.|/[0-9a-f]{64}(_\d+w)?\.")
+CHUNK_SIZE = 64 * 1024
+
+performance_log = logging.getLogger("spaces.performance")
+
+
+class StaticFilesMiddleware:
+    """Serve STATIC_ROOT and MEDIA_ROOT before the URL resolver runs.
+
+    Full responses are FileResponses, which WSGI servers send with
+    ``wsgi.file_wrapper`` (sendfile). Precompressed ``.gz`` siblings are
+    used when the client accepts gzip, and single byte ranges are honoured.
+    Under ASGI the middleware stays async so requests for the async views
+    are not pushed through a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.roots = [
+            (settings.STATIC_URL, settings.STATIC_ROOT),
+            (settings.MEDIA_URL, settings.MEDIA_ROOT),
+        ]
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.find(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = self.find(request)
+        if response is not None:
+            return response
+        return await self.get_response(request)
+
+    def find(self, request):
+        if request.method in ("GET", "HEAD"):
+            for prefix, root in self.roots:
+                if root and request.path.startswith(prefix):
+                    response = self.serve(request, root, request.path[len(prefix) :])
+                    if response is not None:
+                        return response
+        return None
+
+    def serve(self, request, root, name):
+        try:
+            path = safe_join(root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        if not was_modified_since(
+            request.headers.get("If-Modified-Since"), stat.st_mtime
+        ):
+            response = HttpResponseNotModified()
+            self.add_caching_headers(response, name, stat)
+            return response
+
+        content_type, _ = mimetypes.guess_type(path)
+        content_type = content_type or "application/octet-stream"
+        range_header = request.headers.get("Range")
+        accepts_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+        gzipped = path + ".gz"
+
+        if range_header:
+            response = self.serve_range(path, stat.st_size, range_header)
+        elif accepts_gzip and os.path.isfile(gzipped):
+            response = FileResponse(
+                open(gzipped, "rb"), filename=os.path.basename(path)
+            )
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = FileResponse(open(path, "rb"))
+
+        response.headers["Content-Type"] = content_type
+        response.headers["Accept-Ranges"] = "bytes"
+        response.headers["Vary"] = "Accept-Encoding"
+        self.add_caching_headers(response, name, stat)
+        return response
+
+    def serve_range(self, path, size, range_header):
+        match = RANGE_RE.match(range_header.strip())
+        if not match or match.groups() == ("", ""):
+            return FileResponse(open(path, "rb"))
+
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # suffix range: the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+
+        response = StreamingHttpResponse(
+            read_range(path, start, end - start + 1), status=206
+        )
+        response.headers["Content-Length"] = str(end - start + 1)
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return response
+
+    def add_caching_headers(self, response, name, stat):
+        response.headers["Last-Modified"] = http_date(stat.st_mtime)
+        if IMMUTABLE_RE.search(name):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, max-age=3600"
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+class InstrumentationMiddleware:
+    """Time each request's SQL, template rendering and total wall time.
+
+    Adds a ``Server-Timing`` header, logs requests slower than
+    INSTRUMENTATION_SLOW_MS to the "spaces.performance" logger as JSON with
+    their slowest queries, and adds every request to the per-URL-name totals
+    served by the metrics view. Streaming responses are timed up to the
+    point they start streaming.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "INSTRUMENTATION_SLOW_MS", 500)
+        self.server_timing = getattr(settings, "INSTRUMENTATION_SERVER_TIMING", True)
+        connection_created.connect(instrumentation.install_sql_timer)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # connections opened before this middleware was loaded
+        instrumentation.install_on_open_connections()
+        timing, token = instrumentation.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.finish(token)
+        self.report(request, response, timing)
+        return response
+
+    async def __acall__(self, request):
+        timing, token = instrumentation.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.finish(token)
+        self.report(request, response, timing)
+        return response
+
+    def report(self, request, response, timing):
+        total_ms = timing.elapsed_ms()
+        match = request.resolver_match
+        name = (match.view_name if match else None) or "unresolved"
+        instrumentation.record(name, response.status_code, timing, total_ms)
+        if self.server_timing:
+            response.headers["Server-Timing"] = instrumentation.server_timing(
+                timing, total_ms
+            )
+        if total_ms >= self.slow_ms:
+            performance_log.warning(
+                "slow request %s",
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "view": name,
+                        "status": response.status_code,
+                        "total_ms": round(total_ms, 1),
+                        "sql_count": timing.sql_count,
+                        "sql_ms": round(timing.sql_ms, 1),
+                        "template_ms": round(timing.template_ms, 1),
+                        "queries": timing.slowest(),
+                    }
+                ),
+            )
@@ -0,0 +1,84 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+# Postgres enforces non-overlap with a GiST exclusion constraint over the
+# inclusive daterange of each booking, scoped per space (btree_gist supplies
+# the "=" operator class for space_id).
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    """
+    ALTER TABLE spaces_booking
+    ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (
+        space_id WITH =,
+        daterange(from_date, to_date, '[]') WITH &&
+    )
+    """,
+]
+POSTGRES_BACKWARD = [
+    "ALTER TABLE spaces_booking DROP CONSTRAINT IF EXISTS booking_no_overlap",
+]
+
+# SQLite has no exclusion constraints, so the same rule is enforced with
+# triggers that probe the sorted (space_id, to_date, from_date) index.
+SQLITE_FORWARD = [
+    """
+    CREATE TRIGGER booking_no_overlap_insert
+    BEFORE INSERT ON spaces_booking
+    WHEN EXISTS (
+        SELECT 1 FROM spaces_booking
+        WHERE space_id = NEW.space_id
+          AND to_date >= NEW.from_date
+          AND from_date <= NEW.to_date
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+    """
+    CREATE TRIGGER booking_no_overlap_update
+    BEFORE UPDATE OF space_id, from_date, to_date ON spaces_booking
+    WHEN EXISTS (
+        SELECT 1 FROM spaces_booking
+        WHERE space_id = NEW.space_id
+          AND to_date >= NEW.from_date
+          AND from_date <= NEW.to_date
+          AND id != NEW.id
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS booking_no_overlap_insert",
+    "DROP TRIGGER IF EXISTS booking_no_overlap_update",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spaces', '0005_booking_is_paid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['space', 'to_date', 'from_date'], name='booking_space_interval_idx'),
+        ),
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spaces', '0006_booking_interval_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='businessspace',
+            index=models.Index(fields=['category', 'id'], name='space_category_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:00
+
+import spaces.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spaces', '0008_reservationhold'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='businessspace',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=spaces.storage.image_storage, upload_to='uploads/'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:00
+
+from django.db import migrations
+
+# Case-insensitive lookups (username__iexact, email__iexact) compare
+# UPPER(column), so these expression indexes serve the sign-in query.
+FORWARD = [
+    'CREATE INDEX IF NOT EXISTS auth_user_username_upper_idx ON auth_user (UPPER(username))',
+    'CREATE INDEX IF NOT EXISTS auth_user_email_upper_idx ON auth_user (UPPER(email))',
+]
+BACKWARD = [
+    'DROP INDEX IF EXISTS auth_user_username_upper_idx',
+    'DROP INDEX IF EXISTS auth_user_email_upper_idx',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('spaces', '0009_businessspace_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD, BACKWARD),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spaces', '0012_booking_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rent_type', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='spaces.booking')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='spaces.category')),
+                ('space', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='spaces.businessspace')),
+            ],
+            options={
+                'verbose_name_plural': 'daily occupancy',
+                'indexes': [models.Index(fields=['category', 'day'], name='occupancy_category_day_idx'), models.Index(fields=['day', 'rent_type'], name='occupancy_day_rent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('space', 'day'), name='occupancy_space_day_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,158 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Slot bookings share their day with other slot bookings (spaces_slotday
+# keeps them apart), so the non-overlap rule from 0006 now only applies
+# between whole-day bookings, which have no slot mask.
+POSTGRES_FORWARD = [
+    "ALTER TABLE spaces_booking DROP CONSTRAINT IF EXISTS booking_no_overlap",
+    """
+    ALTER TABLE spaces_booking
+    ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (
+        space_id WITH =,
+        daterange(from_date, to_date, '[]') WITH &&
+    ) WHERE (slot_mask IS NULL)
+    """,
+]
+POSTGRES_BACKWARD = [
+    "ALTER TABLE spaces_booking DROP CONSTRAINT IF EXISTS booking_no_overlap",
+    """
+    ALTER TABLE spaces_booking
+    ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (
+        space_id WITH =,
+        daterange(from_date, to_date, '[]') WITH &&
+    )
+    """,
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS booking_no_overlap_insert",
+    "DROP TRIGGER IF EXISTS booking_no_overlap_update",
+]
+SQLITE_FORWARD = SQLITE_DROP + [
+    """
+    CREATE TRIGGER booking_no_overlap_insert
+    BEFORE INSERT ON spaces_booking
+    WHEN NEW.slot_mask IS NULL AND EXISTS (
+        SELECT 1 FROM spaces_booking
+        WHERE space_id = NEW.space_id
+          AND to_date >= NEW.from_date
+          AND from_date <= NEW.to_date
+          AND slot_mask IS NULL
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+    """
+    CREATE TRIGGER booking_no_overlap_update
+    BEFORE UPDATE OF space_id, from_date, to_date, slot_mask ON spaces_booking
+    WHEN NEW.slot_mask IS NULL AND EXISTS (
+        SELECT 1 FROM spaces_booking
+        WHERE space_id = NEW.space_id
+          AND to_date >= NEW.from_date
+          AND from_date <= NEW.to_date
+          AND slot_mask IS NULL
+          AND id != NEW.id
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+]
+SQLITE_BACKWARD = SQLITE_DROP + [
+    """
+    CREATE TRIGGER booking_no_overlap_insert
+    BEFORE INSERT ON spaces_booking
+    WHEN EXISTS (
+        SELECT 1 FROM spaces_booking
+        WHERE space_id = NEW.space_id
+          AND to_date >= NEW.from_date
+          AND from_date <= NEW.to_date
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+    """
+    CREATE TRIGGER booking_no_overlap_update
+    BEFORE UPDATE OF space_id, from_date, to_date ON spaces_booking
+    WHEN EXISTS (
+        SELECT 1 FROM spaces_booking
+        WHERE space_id = NEW.space_id
+          AND to_date >= NEW.from_date
+          AND from_date <= NEW.to_date
+          AND id != NEW.id
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spaces', '0014_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('mask', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='dailyoccupancy',
+            name='occupancy_space_day_uniq',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='slot_mask',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailyoccupancy',
+            name='share',
+            field=models.DecimalField(decimal_places=4, default=1, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='reservationhold',
+            name='slot_mask',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyoccupancy',
+            constraint=models.UniqueConstraint(fields=('booking', 'day'), name='occupancy_booking_day_uniq'),
+        ),
+        migrations.AddField(
+            model_name='slotday',
+            name='space',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='spaces.businessspace'),
+        ),
+        migrations.AddConstraint(
+            model_name='slotday',
+            constraint=models.UniqueConstraint(fields=('space', 'day'), name='slotday_space_day_uniq'),
+        ),
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
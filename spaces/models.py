@@ -2,7 +2,11 @@ import datetime
 import os
 
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+
+from .storage import image_storage
 
 
 # Create your models here.
@@ -27,11 +31,39 @@ class Category(models.Model):
     category = models.CharField(max_length=20, choices=SPACE_CATEGORIES)
     description = models.TextField()
     cost_per_unit = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.category}"
 
 
+class BusinessSpaceQuerySet(models.QuerySet):
+    def with_booked_till(self):
+        # One correlated subquery per row, resolved from the booking
+        # interval index, instead of one query per space in the view.
+        last_to_date = (
+            Booking.objects.whole_days()
+            .filter(space=models.OuterRef("pk"))
+            .order_by("-to_date")
+            .values("to_date")[:1]
+        )
+        return self.annotate(booked_till=models.Subquery(last_to_date))
+
+    def free_between(self, from_date, to_date):
+        # Anti-join against the booking interval index rather than one
+        # conflict query per space. Slot bookings leave the rest of their
+        # day free, so they do not hide a space.
+        return self.filter(availability=True).exclude(
+            models.Exists(
+                Booking.objects.whole_days().filter(
+                    space=models.OuterRef("pk"),
+                    to_date__gte=from_date,
+                    from_date__lte=to_date,
+                )
+            )
+        )
+
+
 class BusinessSpace(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     # Category choices for identification
@@ -49,7 +81,9 @@ class BusinessSpace(models.Model):
         ("SqFt", "Per SqFt per Day"),
     ]
     name = models.CharField(max_length=255, null=False, blank=False)
-    image = models.ImageField(upload_to=getFilename, null=True, blank=True)
+    image = models.ImageField(
+        upload_to="uploads/", storage=image_storage, null=True, blank=True
+    )
     description = models.TextField()
     duration_type = models.CharField(max_length=50, choices=DURATION_CHOICES)
     rent_type = models.CharField(max_length=50, choices=RENT_UNIT_CHOICES)
@@ -57,6 +91,28 @@ class BusinessSpace(models.Model):
     availability = models.BooleanField(
         default=True, help_text="0-not available, 1-available"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BusinessSpaceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["category", "id"], name="space_category_id_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class BookingQuerySet(models.QuerySet):
+    def overlapping(self, space, from_date, to_date):
+        # Inclusive date ranges overlap when each one starts before the
+        # other ends; served by the (space, to_date, from_date) index.
+        return self.filter(space=space, to_date__gte=from_date, from_date__lte=to_date)
+
+    def whole_days(self):
+        """Bookings of whole days, without the slot bookings of a day."""
+        return self.filter(slot_mask__isnull=True)
 
 
 class Booking(models.Model):
@@ -66,7 +122,120 @@ class Booking(models.Model):
     to_date = models.DateField()
     total_cost = models.DecimalField(max_digits=10, decimal_places=2)
     is_paid = models.BooleanField(default=False)
+    # slots of the day booked (see spaces.slots); null books whole days
+    slot_mask = models.BigIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["space", "to_date", "from_date"],
+                name="booking_space_interval_idx",
+            ),
+            # "my bookings" pages: newest first, keyset on (created_at, id)
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="booking_user_created_idx",
+            ),
+            # admin changelist: default ordering, date hierarchy and the
+            # paid filter
+            models.Index(fields=["-created_at", "-id"], name="booking_created_idx"),
+            models.Index(
+                fields=["is_paid", "-created_at"], name="booking_paid_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.space.name} ({self.from_date} - {self.to_date})"
+
+    def clean(self):
+        if self.from_date and self.to_date and self.to_date < self.from_date:
+            raise ValidationError({"to_date": "To date cannot be before from date"})
+
+
+class ReservationHoldQuerySet(BookingQuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class ReservationHold(models.Model):
+    """Short-lived claim on a space's dates between confirm and payment."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    space = models.ForeignKey(BusinessSpace, on_delete=models.CASCADE)
+    from_date = models.DateField()
+    to_date = models.DateField()
+    total_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    slot_mask = models.BigIntegerField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ReservationHoldQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["space", "to_date", "from_date"],
+                name="hold_space_interval_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Hold on {self.space_id} ({self.from_date} - {self.to_date})"
+
+
+class SlotDay(models.Model):
+    """Slots of one day of a space taken by slot bookings, as a bitmap."""
+
+    space = models.ForeignKey(BusinessSpace, on_delete=models.CASCADE)
+    day = models.DateField()
+    mask = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["space", "day"], name="slotday_space_day_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.space_id} on {self.day}"
+
+
+class DailyOccupancy(models.Model):
+    """One booked day of a space with its share of the booking's revenue.
+
+    Maintained from Booking saves (see spaces.rollups); a day without a row
+    is a free day. Category and rent type are copied from the space so the
+    reports group without joins. ``share`` is the fraction of the day
+    booked: 1 for whole-day bookings, less for slot bookings.
+    """
+
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE)
+    space = models.ForeignKey(BusinessSpace, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    rent_type = models.CharField(max_length=50)
+    day = models.DateField()
+    revenue = models.DecimalField(max_digits=10, decimal_places=2)
+    share = models.DecimalField(max_digits=5, decimal_places=4, default=1)
+
+    class Meta:
+        verbose_name_plural = "daily occupancy"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["booking", "day"], name="occupancy_booking_day_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["category", "day"], name="occupancy_category_day_idx"),
+            models.Index(fields=["day", "rent_type"], name="occupancy_day_rent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.space_id} on {self.day}"
@@ -0,0 +1,149 @@
+"""Booking quotes.
+
+Billable days are counted with per-year day-type bitmaps: bit ``n`` of a
+year's mask is day ``n`` of that year (January 1st is bit 0). Counting the
+billable days of a range is a shift, an AND and a popcount per calendar
+year it touches, however long the range is.
+"""
+
+import math
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+
+PRICERS = {}
+CENT = Decimal("0.01")
+
+
+Quote = namedtuple("Quote", ["days", "billable_days", "total"])
+
+
+def pricer(rent_type):
+    """Register the function that prices ``rent_type`` spaces.
+
+    Pricers are called as ``func(space, rate, billable_days)``.
+    """
+
+    def register(func):
+        PRICERS[rent_type] = func
+        return func
+
+    return register
+
+
+@pricer("Day Wise")
+@pricer("SqFt")
+def per_day(space, rate, billable_days):
+    return billable_days * rate
+
+
+@pricer("Week Wise")
+def per_week(space, rate, billable_days):
+    return math.ceil(billable_days / 7) * rate
+
+
+@pricer("Hour Wise")
+def per_hour(space, rate, billable_days):
+    # every slot of each billable day, as quote_slots would charge them
+    return billable_days * 24 * rate
+
+
+def public_holidays():
+    return frozenset(
+        date.fromisoformat(day) if isinstance(day, str) else day
+        for day in getattr(settings, "PUBLIC_HOLIDAYS", [])
+    )
+
+
+@lru_cache(maxsize=64)
+def year_masks(year, holidays):
+    """Bitmaps of the weekdays, weekends and public holidays of ``year``."""
+    first = date(year, 1, 1)
+    length = (date(year + 1, 1, 1) - first).days
+
+    # a week of bits starting on January 1st, repeated across the year
+    week = 0
+    for offset in range(7):
+        if (first.weekday() + offset) % 7 < 5:
+            week |= 1 << offset
+    weekday = 0
+    for start in range(0, length, 7):
+        weekday |= week << start
+    every_day = (1 << length) - 1
+    weekday &= every_day
+
+    holiday = 0
+    for day in holidays:
+        if day.year == year:
+            holiday |= 1 << (day - first).days
+
+    return {
+        "All Days": every_day,
+        "Week Days": weekday & ~holiday,
+        "Week Ends": every_day & ~weekday,
+        "Public Holidays": holiday,
+    }
+
+
+def billable_days(duration_type, from_date, to_date, holidays=None):
+    """Days of the inclusive range that ``duration_type`` charges for."""
+    if holidays is None:
+        holidays = public_holidays()
+
+    count = 0
+    for year in range(from_date.year, to_date.year + 1):
+        masks = year_masks(year, frozenset(d for d in holidays if d.year == year))
+        mask = masks.get(duration_type, masks["All Days"])
+
+        first = date(year, 1, 1)
+        start = (max(from_date, first) - first).days
+        end = (min(to_date, date(year, 12, 31)) - first).days
+        window = ((1 << (end - start + 1)) - 1) << start
+        count += (mask & window).bit_count()
+    return count
+
+
+def booking_days(from_date, to_date):
+    return (to_date - from_date).days + 1
+
+
+def quote_many(requests):
+    """Quote a batch of ``(space, from_date, to_date)`` requests.
+
+    Spaces without their own cost are charged their category's
+    ``cost_per_unit``; those categories are fetched in one query.
+    """
+    requests = list(requests)
+    prefetch_related_objects(
+        [space for space, _, _ in requests if not space.cost], "category"
+    )
+    holidays = public_holidays()
+
+    quotes = []
+    for space, from_date, to_date in requests:
+        rate = space.cost or space.category.cost_per_unit
+        billable = billable_days(space.duration_type, from_date, to_date, holidays)
+        price = PRICERS.get(space.rent_type)
+        total = price(space, rate, billable) if price else 0
+        quotes.append(Quote(booking_days(from_date, to_date), billable, total))
+    return quotes
+
+
+def quote(space, from_date, to_date):
+    return quote_many([(space, from_date, to_date)])[0]
+
+
+def quote_slots(space, day, slots, slot_minutes):
+    """Quote ``slots`` slots of ``slot_minutes`` on ``day``.
+
+    Slot spaces charge their rate per hour; a day their duration type does
+    not bill is free, as with whole-day bookings.
+    """
+    rate = space.cost or space.category.cost_per_unit
+    billable = billable_days(space.duration_type, day, day)
+    total = (rate * slots * slot_minutes / 60 * billable).quantize(CENT)
+    return Quote(1, billable, total)
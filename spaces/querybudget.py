@@ -0,0 +1,154 @@
+"""Query budgets for views.
+
+``QueryBudgetMixin.assertMaxQueries`` fails a test when the wrapped block
+runs more SQL queries than allowed and prints every query with the stack
+that issued it, trimmed to this project's frames. ``seed_dataset`` builds
+a data set whose size is set by ``scale``, so the same budget can be
+checked at several sizes - a budget that holds at every scale shows the
+view's query count does not grow with the number of rows.
+"""
+
+import os
+import time
+import traceback
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+
+from .models import Booking, BusinessSpace, Category
+
+PROJECT_ROOT = str(settings.BASE_DIR)
+
+
+def _project_frames():
+    return [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(PROJECT_ROOT)
+        and "site-packages" not in frame.filename
+        and not frame.filename.endswith(os.path.join("spaces", "querybudget.py"))
+    ]
+
+
+class QueryRecorder:
+    """An ``execute_wrapper`` that keeps each query with its call stack."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        began = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "params": params,
+                    "ms": (time.perf_counter() - began) * 1000,
+                    "stack": _project_frames(),
+                }
+            )
+
+    def report(self):
+        lines = []
+        for number, query in enumerate(self.queries, 1):
+            lines.append(f"{number}. ({query['ms']:.1f}ms) {query['sql']}")
+            lines.append(f"   params: {query['params']!r}")
+            for frame in query["stack"]:
+                path = os.path.relpath(frame.filename, PROJECT_ROOT)
+                lines.append(f"     {path}:{frame.lineno} in {frame.name}")
+                if frame.line:
+                    lines.append(f"       {frame.line}")
+        return "\n".join(lines)
+
+
+class _MaxQueriesContext:
+    def __init__(self, test_case, budget, label):
+        self.test_case = test_case
+        self.budget = budget
+        self.label = label
+        self.recorder = QueryRecorder()
+
+    def __enter__(self):
+        self.wrapper = connection.execute_wrapper(self.recorder)
+        self.wrapper.__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.wrapper.__exit__(exc_type, exc_value, tb)
+        if exc_type is not None:
+            return
+        count = len(self.recorder.queries)
+        if count > self.budget:
+            self.test_case.fail(
+                f"{self.label} ran {count} queries, budget is {self.budget}:\n"
+                + self.recorder.report()
+            )
+
+
+class QueryBudgetMixin:
+    def assertMaxQueries(self, budget, label="Block"):
+        return _MaxQueriesContext(self, budget, label)
+
+
+def seed_dataset(scale=1):
+    """Categories, spaces and bookings; row counts grow with ``scale``.
+
+    Returns the objects a URL needs as arguments: a customer with paid and
+    unpaid bookings, a staff user, one category, space and booking.
+    """
+    customer = User.objects.create_user(
+        username="customer", email="customer@example.com", password="pass"
+    )
+    staff = User.objects.create_user(username="staff", password="pass", is_staff=True)
+    other = User.objects.create_user(username="other", password="pass")
+
+    categories = Category.objects.bulk_create(
+        Category(
+            category=code, description=code.title(), cost_per_unit=Decimal("100.00")
+        )
+        for code in ["SHOP_S", "SHOP_M", "CINEMA"]
+    )
+    spaces = BusinessSpace.objects.bulk_create(
+        BusinessSpace(
+            category=category,
+            name=f"{category.category} {i}",
+            description="Seeded space",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("0.00") if i % 2 else Decimal("500.00"),
+            availability=i % 7 != 6,
+        )
+        for category in categories
+        for i in range(5 * scale)
+    )
+
+    today = date.today()
+    bookings = []
+    for i, space in enumerate(spaces):
+        user = customer if i % 2 == 0 else other
+        start = today + timedelta(days=i % 5)
+        bookings.append(
+            Booking(
+                user=user,
+                space=space,
+                from_date=start,
+                to_date=start + timedelta(days=2),
+                total_cost=Decimal("1500.00"),
+                is_paid=i % 3 != 2,
+            )
+        )
+    bookings = Booking.objects.bulk_create(bookings)
+
+    return SimpleNamespace(
+        customer=customer,
+        staff=staff,
+        category=categories[0],
+        space=spaces[0],
+        booking=bookings[0],
+    )
@@ -0,0 +1,174 @@
+"""Daily occupancy and revenue rollups.
+
+Every booked day of a space has a DailyOccupancy row carrying an equal
+share of the booking's total (the last day takes the rounding remainder).
+A slot booking covers part of its day, and its row's ``share`` says which
+fraction, so booked days add up to whole days across slot bookings.
+Rows are rewritten whenever a booking is saved, removed with it by the
+foreign key cascade, and can be rebuilt in bulk with ``rebuild_rollups``.
+The reports below aggregate those rows only, never the Booking table.
+"""
+
+import calendar
+from datetime import date, timedelta
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Booking, BusinessSpace, Category, DailyOccupancy
+from .slots import slots_per_day
+
+CENT = Decimal("0.01")
+REBUILD_CHUNK_SIZE = 2000
+
+
+def day_shares(booking):
+    """(day, revenue) for each day of the booking; none if it ends first."""
+    days = (booking.to_date - booking.from_date).days + 1
+    if days < 1:
+        return []
+    total = Decimal(booking.total_cost)
+    share = (total / days).quantize(CENT, rounding=ROUND_DOWN)
+    last = total - share * (days - 1)
+    return [
+        (booking.from_date + timedelta(days=i), share if i < days - 1 else last)
+        for i in range(days)
+    ]
+
+
+def day_share(booking):
+    """Fraction of each of its days the booking takes."""
+    if booking.slot_mask is None:
+        return Decimal(1)
+    return (Decimal(booking.slot_mask.bit_count()) / slots_per_day()).quantize(
+        Decimal("0.0001")
+    )
+
+
+def occupancy_rows(booking, space):
+    share = day_share(booking)
+    return [
+        DailyOccupancy(
+            booking_id=booking.id,
+            space_id=space.id,
+            category_id=space.category_id,
+            rent_type=space.rent_type,
+            day=day,
+            revenue=revenue,
+            share=share,
+        )
+        for day, revenue in day_shares(booking)
+    ]
+
+
+def refresh_booking(booking):
+    """Rewrite the rollup rows of one booking."""
+    with transaction.atomic():
+        DailyOccupancy.objects.filter(booking_id=booking.id).delete()
+        DailyOccupancy.objects.bulk_create(occupancy_rows(booking, booking.space))
+
+
+def refresh_space(space):
+    """Copy a space's category and rent type onto its rollup rows."""
+    DailyOccupancy.objects.filter(space_id=space.id).update(
+        category_id=space.category_id, rent_type=space.rent_type
+    )
+
+
+def rebuild(chunk_size=REBUILD_CHUNK_SIZE):
+    """Recreate every rollup row from the Booking table; returns the count."""
+    created = 0
+    rows = []
+    bookings = Booking.objects.select_related("space").order_by("id")
+    with transaction.atomic():
+        DailyOccupancy.objects.all().delete()
+        for booking in bookings.iterator(chunk_size=chunk_size):
+            rows.extend(occupancy_rows(booking, booking.space))
+            if len(rows) >= chunk_size:
+                created += len(DailyOccupancy.objects.bulk_create(rows))
+                rows = []
+        created += len(DailyOccupancy.objects.bulk_create(rows))
+    return created
+
+
+def _year_bounds(year):
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def _rate(booked_days, space_days):
+    return round(float(booked_days) * 100 / space_days, 1) if space_days else 0.0
+
+
+def by_category(start, end):
+    """Booked days, occupancy % and revenue per category over [start, end]."""
+    days = (end - start).days + 1
+    names = dict(Category.objects.values_list("id", "category"))
+    spaces = dict(
+        BusinessSpace.objects.order_by()
+        .values_list("category_id")
+        .annotate(count=Count("id"))
+    )
+    rows = (
+        DailyOccupancy.objects.filter(day__range=(start, end))
+        .values("category_id")
+        .annotate(booked_days=Sum("share"), revenue=Sum("revenue"))
+        .order_by("category_id")
+    )
+    return [
+        {
+            "category": names.get(row["category_id"]),
+            "booked_days": row["booked_days"],
+            "occupancy": _rate(
+                row["booked_days"], spaces.get(row["category_id"], 0) * days
+            ),
+            "revenue": row["revenue"],
+        }
+        for row in rows
+    ]
+
+
+def by_month(year):
+    """Booked days, occupancy % and revenue per month of ``year``."""
+    start, end = _year_bounds(year)
+    spaces = BusinessSpace.objects.count()
+    rows = (
+        DailyOccupancy.objects.filter(day__range=(start, end))
+        .annotate(month=TruncMonth("day"))
+        .values("month")
+        .annotate(booked_days=Sum("share"), revenue=Sum("revenue"))
+        .order_by("month")
+    )
+    return [
+        {
+            "month": row["month"],
+            "booked_days": row["booked_days"],
+            "occupancy": _rate(
+                row["booked_days"],
+                spaces * calendar.monthrange(year, row["month"].month)[1],
+            ),
+            "revenue": row["revenue"],
+        }
+        for row in rows
+    ]
+
+
+def by_rent_type(start, end):
+    """Booked days and revenue per rent type over [start, end]."""
+    return list(
+        DailyOccupancy.objects.filter(day__range=(start, end))
+        .values("rent_type")
+        .annotate(booked_days=Sum("share"), revenue=Sum("revenue"))
+        .order_by("rent_type")
+    )
+
+
+def year_report(year):
+    start, end = _year_bounds(year)
+    return {
+        "year": year,
+        "categories": by_category(start, end),
+        "months": by_month(year),
+        "rent_types": by_rent_type(start, end),
+    }
@@ -0,0 +1,50 @@
+"""Cache-backed sessions with a database fallback that skip no-op writes.
+
+Reads are served from the cache and only go to ``django_session`` on a
+miss. A save whose data is identical to what was loaded - e.g. assigning
+the same ``pending_booking`` again - does not touch the cache or the
+database. The session's expiry is refreshed whenever its data changes.
+"""
+
+import hashlib
+
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_digest = None
+
+    def _digest(self, data):
+        return hashlib.sha256(self.serializer().dumps(data)).hexdigest()
+
+    def _unchanged(self, must_create):
+        return (
+            not must_create
+            and self.session_key is not None
+            and self._loaded_digest is not None
+            and self._digest(self._get_session(no_load=True)) == self._loaded_digest
+        )
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = self._digest(data)
+        return data
+
+    async def aload(self):
+        data = await super().aload()
+        self._loaded_digest = self._digest(data)
+        return data
+
+    def save(self, must_create=False):
+        if self._unchanged(must_create):
+            return
+        super().save(must_create)
+        self._loaded_digest = self._digest(self._get_session(no_load=True))
+
+    async def asave(self, must_create=False):
+        if self._unchanged(must_create):
+            return
+        await super().asave(must_create)
+        self._loaded_digest = self._digest(self._get_session(no_load=True))
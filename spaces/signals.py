@@ -0,0 +1,65 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import forget_user
+from .cache import bump_version
+from .models import Booking, BusinessSpace, Category
+from .rollups import refresh_booking, refresh_space
+from .slots import release
+
+
+def _invalidate(namespace):
+    # Bump now so this request sees its own write, and again on commit so
+    # a reader that refilled the cache from pre-commit data is discarded.
+    bump_version(namespace)
+    transaction.on_commit(partial(bump_version, namespace))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=BusinessSpace)
+@receiver(post_delete, sender=BusinessSpace)
+def invalidate_catalog(sender, **kwargs):
+    _invalidate("catalog")
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_bookings(sender, **kwargs):
+    _invalidate("bookings")
+
+
+@receiver(post_save, sender=Booking)
+def update_booking_rollup(sender, instance, raw=False, **kwargs):
+    # deleted bookings take their rollup rows with them (on_delete=CASCADE)
+    if not raw:
+        refresh_booking(instance)
+
+
+@receiver(post_delete, sender=Booking)
+def release_booking_slots(sender, instance, **kwargs):
+    if instance.slot_mask is not None:
+        release(instance.space_id, instance.from_date, instance.slot_mask)
+
+
+@receiver(post_save, sender=BusinessSpace)
+def update_space_rollup(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        refresh_space(instance)
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_saved_user(sender, instance, **kwargs):
+    # covers password changes, which save the user
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
@@ -0,0 +1,154 @@
+"""Slot bookings within a day.
+
+"Hour Wise" spaces are booked by the slot: a day is cut into slots of
+SPACES_SLOT_MINUTES and bit ``n`` of a mask is the slot starting ``n``
+slots after midnight. Each space-day with slot bookings has one SlotDay row
+whose mask is the union of its bookings' masks, so a conflict check is an
+AND and taking slots is a single conditional UPDATE:
+
+    UPDATE spaces_slotday SET mask = mask | :wanted
+    WHERE space_id = :space AND day = :day AND mask & :wanted = 0
+
+which either takes every wanted slot or none. Whole-day bookings block
+every slot of their days.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Booking, BusinessSpace, SlotDay
+
+SLOT_RENT_TYPE = "Hour Wise"
+
+
+def slot_minutes():
+    minutes = getattr(settings, "SPACES_SLOT_MINUTES", 60)
+    # masks are stored in a signed 64-bit column
+    if minutes <= 0 or 1440 % minutes or 1440 // minutes > 63:
+        raise ImproperlyConfigured(
+            "SPACES_SLOT_MINUTES must divide a day into at most 63 slots"
+        )
+    return minutes
+
+
+def slots_per_day():
+    return 1440 // slot_minutes()
+
+
+def full_day():
+    return (1 << slots_per_day()) - 1
+
+
+def is_slot_space(space):
+    return space.rent_type == SLOT_RENT_TYPE
+
+
+def slot_mask(indexes):
+    """Mask of the given slot numbers; raises ValueError if one is invalid."""
+    mask = 0
+    for index in indexes:
+        index = int(index)
+        if not 0 <= index < slots_per_day():
+            raise ValueError("Invalid time slot")
+        mask |= 1 << index
+    return mask
+
+
+def slot_indexes(mask):
+    return [index for index in range(slots_per_day()) if mask >> index & 1]
+
+
+def slot_start(index):
+    return (datetime.min + timedelta(minutes=index * slot_minutes())).time()
+
+
+def describe(mask):
+    """Merged slot ranges, e.g. "09:00-11:00, 14:00-15:00"."""
+    ranges = []
+    start = None
+    for index in range(slots_per_day() + 1):
+        taken = index < slots_per_day() and mask >> index & 1
+        if taken and start is None:
+            start = index
+        elif not taken and start is not None:
+            end = "24:00" if index == slots_per_day() else f"{slot_start(index):%H:%M}"
+            ranges.append(f"{slot_start(start):%H:%M}-{end}")
+            start = None
+    return ", ".join(ranges)
+
+
+def taken_mask(space, day):
+    """Mask of the taken slots of ``space`` on ``day``, in one query."""
+    mask, whole_day = (
+        BusinessSpace.objects.filter(pk=space.pk)
+        .values_list(
+            Subquery(
+                SlotDay.objects.filter(space=OuterRef("pk"), day=day).values("mask")[:1]
+            ),
+            Exists(
+                Booking.objects.filter(
+                    space=OuterRef("pk"),
+                    slot_mask__isnull=True,
+                    from_date__lte=day,
+                    to_date__gte=day,
+                )
+            ),
+        )
+        .get()
+    )
+    return full_day() if whole_day else mask or 0
+
+
+def past_mask(day, now=None):
+    """Mask of the slots of ``day`` that have started, in local time."""
+    now = timezone.localtime(now).replace(tzinfo=None)
+    return slot_mask(
+        index
+        for index in range(slots_per_day())
+        if datetime.combine(day, slot_start(index)) < now
+    )
+
+
+def day_slots(space, day, now=None):
+    """(index, start time, free) for every slot of the day.
+
+    Slots that have already started are not free.
+    """
+    closed = taken_mask(space, day) | past_mask(day, now)
+    return [
+        (index, slot_start(index), not closed >> index & 1)
+        for index in range(slots_per_day())
+    ]
+
+
+def reserve(space_id, day, mask):
+    """Take the slots of ``mask``; False if any of them is already taken."""
+    SlotDay.objects.bulk_create(
+        [SlotDay(space_id=space_id, day=day, mask=0)], ignore_conflicts=True
+    )
+    return bool(
+        SlotDay.objects.filter(space_id=space_id, day=day)
+        .alias(clash=F("mask").bitand(mask))
+        .filter(clash=0)
+        .update(mask=F("mask").bitor(mask))
+    )
+
+
+def release(space_id, day, mask):
+    SlotDay.objects.filter(space_id=space_id, day=day).update(
+        mask=F("mask").bitand(full_day() & ~mask)
+    )
+
+
+def slot_time_range(day, mask):
+    """Start and end datetimes spanned by the slots of ``mask``."""
+    indexes = slot_indexes(mask)
+    start = datetime.combine(day, slot_start(indexes[0]))
+    end = datetime.combine(day, time.min) + timedelta(
+        minutes=(indexes[-1] + 1) * slot_minutes()
+    )
+    return start, end
@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import os
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+from PIL import Image, ImageOps
+
+# Widths of the WebP variants generated for every uploaded image
+VARIANT_WIDTHS = (320, 640)
+
+# "<directory>/<first two hex digits>/<sha256>.<ext>"
+HASHED_NAME = re.compile(r"^(?:(.*)/)?([0-9a-f]{2})/\2[0-9a-f]{62}(\.\w+)?$")
+
+
+def variant_name(name, width):
+    root, _ = os.path.splitext(name)
+    return f"{root}_{width}w.webp"
+
+
+class ContentHashImageStorage(FileSystemStorage):
+    """Stores uploads under the SHA-256 of their content.
+
+    Uploading a file that is already stored returns the existing name
+    instead of writing a second copy. New images get resized WebP variants
+    (see VARIANT_WIDTHS) next to the original.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        # saving a stored file again (process_images reruns) keeps its name
+        hashed = HASHED_NAME.match(name)
+        directory = (hashed.group(1) if hashed else os.path.dirname(name)) or "uploads"
+        _, ext = os.path.splitext(name)
+        hexdigest = digest.hexdigest()
+        name = f"{directory}/{hexdigest[:2]}/{hexdigest}{ext.lower()}"
+
+        if not self.exists(name):
+            name = super().save(name, content, max_length)
+        self.generate_variants(name)
+        return name
+
+    def generate_variants(self, name):
+        missing = [
+            width
+            for width in VARIANT_WIDTHS
+            if not self.exists(variant_name(name, width))
+        ]
+        if not missing:
+            return
+
+        try:
+            with Image.open(self.path(name)) as image:
+                # decode JPEGs at reduced scale when they are much larger
+                image.draft("RGB", (max(missing), max(missing)))
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if "A" in image.mode else "RGB")
+
+                for width in missing:
+                    variant = image.copy()
+                    variant.thumbnail((width, width * 4))
+                    variant.save(
+                        self.path(variant_name(name, width)), "WEBP", quality=80
+                    )
+        except OSError:
+            # not an image Pillow can read - serve the original only
+            return
+
+
+def image_storage():
+    return ContentHashImageStorage()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest-hashed static files with a ``.gz`` copy of each text asset.
+
+    The gzip variants are written once by collectstatic so they can be
+    served without compressing per request.
+    """
+
+    compressible_extensions = (".css", ".js", ".svg", ".txt", ".json", ".xml")
+
+    def post_process(self, paths, dry_run=False, **options):
+        # files can be yielded once per post-processing pass
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+        for name in sorted(hashed_names):
+            if name.endswith(self.compressible_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) < len(content):
+            with open(self.path(name) + ".gz", "wb") as target:
+                target.write(compressed)
@@ -0,0 +1,30 @@
+from django import template
+
+from spaces.storage import VARIANT_WIDTHS, variant_name
+
+register = template.Library()
+
+
+def _variants(image):
+    if not image:
+        return []
+    return [
+        (width, image.storage.url(variant_name(image.name, width)))
+        for width in VARIANT_WIDTHS
+        if image.storage.exists(variant_name(image.name, width))
+    ]
+
+
+@register.filter
+def thumbnail_url(image):
+    """URL of the smallest WebP variant, or of the original image."""
+    variants = _variants(image)
+    if variants:
+        return variants[0][1]
+    return image.url if image else ""
+
+
+@register.filter
+def srcset(image):
+    """``srcset`` value listing the WebP variants of an image."""
+    return ", ".join(f"{url} {width}w" for width, url in _variants(image))
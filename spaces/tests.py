@@ -1,11 +1,87 @@
-from datetime import date, timedelta
+import asyncio
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+import zipfile
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from urllib.parse import urlencode
 
+from asgiref.sync import async_to_sync
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.db import (
+    IntegrityError,
+    OperationalError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
 
-from .models import Booking, BusinessSpace, Category
+from . import instrumentation, urls
+from .auth import EmailOrUsernameBackend
+from .availability import next_free_window, space_availability
+from .dbpool import pool_stats
+from .holds import (
+    BookingConflict,
+    convert_hold,
+    place_hold,
+    place_slot_hold,
+    sweep_expired_holds,
+)
+from .middleware import StaticFilesMiddleware
+from .models import (
+    Booking,
+    BusinessSpace,
+    Category,
+    DailyOccupancy,
+    ReservationHold,
+    SlotDay,
+)
+from .pricing import billable_days, quote, quote_many, quote_slots
+from .querybudget import QueryBudgetMixin, seed_dataset
+from .rollups import by_category, by_month, by_rent_type
+from .sessions import SessionStore
+from .slots import (
+    describe,
+    full_day,
+    past_mask,
+    reserve,
+    slot_indexes,
+    slot_mask,
+    taken_mask,
+)
+from .storage import VARIANT_WIDTHS, variant_name
+from .templatetags.images import srcset, thumbnail_url
 
 
 class CategoryModelTest(TestCase):
@@ -157,4 +233,1977 @@ class MyBookingsViewTest(TestCase):
             
             # Check if the calculated cost in the context is exactly 3000
             self.assertEqual(response.context['total_cost'], Decimal("3000.00"))
-            self.assertEqual(response.context['days'], 3)
\ No newline at end of file
+            self.assertEqual(response.context['days'], 3)
+
+
+class BookingOverlapTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        category = Category.objects.create(
+            category="SHOP_L", description="Large shop", cost_per_unit=Decimal("300.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=category,
+            name="Shop L1",
+            description="Corner shop",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("800.00"),
+        )
+        self.start = date.today() + timedelta(days=10)
+        Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=self.start,
+            to_date=self.start + timedelta(days=4),
+            total_cost=Decimal("4000.00"),
+            is_paid=True,
+        )
+
+    def test_overlapping_lookup(self):
+        overlapping = Booking.objects.overlapping(
+            self.space, self.start + timedelta(days=4), self.start + timedelta(days=6)
+        )
+        self.assertTrue(overlapping.exists())
+        adjacent = Booking.objects.overlapping(
+            self.space, self.start + timedelta(days=5), self.start + timedelta(days=6)
+        )
+        self.assertFalse(adjacent.exists())
+
+    def test_database_rejects_overlap(self):
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Booking.objects.create(
+                    user=self.user,
+                    space=self.space,
+                    from_date=self.start - timedelta(days=1),
+                    to_date=self.start,
+                    total_cost=Decimal("1600.00"),
+                )
+
+    def test_database_allows_adjacent_booking(self):
+        Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=self.start + timedelta(days=5),
+            to_date=self.start + timedelta(days=6),
+            total_cost=Decimal("1600.00"),
+        )
+        self.assertEqual(Booking.objects.filter(space=self.space).count(), 2)
+
+
+class RentalsCategoryViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.category = Category.objects.create(
+            category="SHOP_S", description="Small shop", cost_per_unit=Decimal("100.00")
+        )
+
+    def create_spaces(self, count):
+        spaces = []
+        for i in range(count):
+            space = BusinessSpace.objects.create(
+                category=self.category,
+                name=f"Shop S{i}",
+                description="Small shop",
+                duration_type="All Days",
+                rent_type="Day Wise",
+                cost=Decimal("100.00"),
+                availability=i % 5 != 0,
+            )
+            Booking.objects.create(
+                user=self.user,
+                space=space,
+                from_date=date.today(),
+                to_date=date.today() + timedelta(days=i + 1),
+                total_cost=Decimal("200.00"),
+                is_paid=True,
+            )
+            spaces.append(space)
+        return spaces
+
+    def test_unknown_category_redirects(self):
+        response = self.client.get(reverse("rentals_category", args=["NOPE"]))
+        self.assertRedirects(response, reverse("rentals"))
+
+    def test_booking_status(self):
+        booked, not_rentable = self.create_spaces(2)[::-1]
+        free = BusinessSpace.objects.create(
+            category=self.category,
+            name="Shop Free",
+            description="Small shop",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("100.00"),
+        )
+        response = self.client.get(reverse("rentals_category", args=["SHOP_S"]))
+        spaces = {space.id: space for space in response.context["businessSpace"]}
+
+        self.assertEqual(spaces[booked.id].status, "booked")
+        self.assertEqual(spaces[booked.id].booked_till, date.today() + timedelta(2))
+        self.assertEqual(
+            spaces[booked.id].available_from, date.today() + timedelta(days=3)
+        )
+        self.assertEqual(spaces[not_rentable.id].status, "not_rentable")
+        self.assertEqual(spaces[free.id].status, "available")
+        self.assertEqual(spaces[free.id].available_from, date.today())
+
+    def test_query_count_independent_of_space_count(self):
+        # category codes, the page's ETag stamp and the listing
+        url = reverse("rentals_category", args=["SHOP_S"])
+        self.create_spaces(3)
+        with self.assertNumQueries(3):
+            self.client.get(url)
+        self.create_spaces(40)
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_keyset_pagination(self):
+        spaces = self.create_spaces(30)
+        url = reverse("rentals_category", args=["SHOP_S"])
+
+        response = self.client.get(url)
+        first_page = response.context["businessSpace"]
+        self.assertEqual(len(first_page), 24)
+        self.assertEqual(response.context["next_after"], first_page[-1].id)
+
+        response = self.client.get(url, {"after": response.context["next_after"]})
+        second_page = response.context["businessSpace"]
+        self.assertEqual([s.id for s in second_page], [s.id for s in spaces[24:]])
+        self.assertIsNone(response.context["next_after"])
+
+
+class AvailabilityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        category = Category.objects.create(
+            category="ATRIUM_NW", description="Atrium", cost_per_unit=Decimal("50.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=category,
+            name="Atrium NW",
+            description="North west atrium",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("100.00"),
+        )
+        self.today = date.today()
+        # booked: +2..+4, +5..+6 (touching), +8..+9 (one free day), +20..+25
+        for start, end in [(2, 4), (5, 6), (8, 9), (20, 25)]:
+            self.book(start, end)
+
+    def book(self, start, end):
+        Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=self.today + timedelta(days=start),
+            to_date=self.today + timedelta(days=end),
+            total_cost=Decimal("100.00"),
+            is_paid=True,
+        )
+
+    def day(self, offset):
+        return self.today + timedelta(days=offset)
+
+    def test_merged_intervals_and_free_windows(self):
+        with self.assertNumQueries(1):
+            result = space_availability(self.space, self.today, horizon_days=40)
+
+        self.assertEqual(
+            result["booked"],
+            [
+                (self.day(2), self.day(6)),
+                (self.day(8), self.day(9)),
+                (self.day(20), self.day(25)),
+            ],
+        )
+        # the single free day at +7 is shorter than the two day minimum
+        self.assertEqual(
+            result["free"],
+            [
+                (self.day(0), self.day(1)),
+                (self.day(10), self.day(19)),
+                (self.day(26), None),
+            ],
+        )
+
+    def test_next_free_window_skips_short_gaps(self):
+        result = space_availability(self.space, self.day(3))
+        self.assertEqual(
+            next_free_window(result, self.day(3)), (self.day(10), self.day(19))
+        )
+
+    def test_booking_check_suggests_next_window(self):
+        self.client.login(username="testuser", password="testpass")
+        response = self.client.post(
+            reverse("booking", kwargs={"space_id": self.space.id}),
+            {
+                "action": "check",
+                "from_date": self.day(3).isoformat(),
+                "to_date": self.day(4).isoformat(),
+            },
+        )
+        self.assertFalse(response.context["available"])
+        self.assertEqual(response.context["next_available"], self.day(10))
+        self.assertEqual(response.context["next_booking_start"], self.day(19))
+
+    def test_availability_endpoint(self):
+        response = self.client.get(
+            reverse("availability", kwargs={"space_id": self.space.id}),
+            {"days": 40, "min_days": 5},
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["booked"][0], [str(self.day(2)), str(self.day(6))])
+        self.assertEqual(
+            data["free"],
+            [[str(self.day(10)), str(self.day(19))], [str(self.day(26)), None]],
+        )
+
+    def test_availability_endpoint_rejects_bad_dates(self):
+        response = self.client.get(
+            reverse("availability", kwargs={"space_id": self.space.id}),
+            {"from": "tomorrow"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class SpaceSearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        category = Category.objects.create(
+            category="SHOP_M",
+            description="Medium shop",
+            cost_per_unit=Decimal("200.00"),
+        )
+        self.start = date.today() + timedelta(days=5)
+        self.spaces = []
+        for i in range(4):
+            self.spaces.append(
+                BusinessSpace.objects.create(
+                    category=category,
+                    name=f"Shop M{i}",
+                    description="Medium shop",
+                    duration_type="All Days",
+                    rent_type="Day Wise",
+                    cost=Decimal("250.00"),
+                    availability=i != 3,
+                )
+            )
+        # Shop M0 overlaps the searched range, Shop M1 ends the day before it
+        Booking.objects.create(
+            user=self.user,
+            space=self.spaces[0],
+            from_date=self.start + timedelta(days=1),
+            to_date=self.start + timedelta(days=8),
+            total_cost=Decimal("2000.00"),
+        )
+        Booking.objects.create(
+            user=self.user,
+            space=self.spaces[1],
+            from_date=self.start - timedelta(days=3),
+            to_date=self.start - timedelta(days=1),
+            total_cost=Decimal("750.00"),
+        )
+        self.dates = {
+            "from_date": self.start.isoformat(),
+            "to_date": (self.start + timedelta(days=2)).isoformat(),
+        }
+
+    def test_search_lists_only_free_spaces(self):
+        url = reverse("rentals_category", args=["SHOP_M"])
+        with self.assertNumQueries(3):
+            response = self.client.get(url, self.dates)
+        spaces = response.context["businessSpace"]
+        self.assertEqual(
+            [space.id for space in spaces], [self.spaces[1].id, self.spaces[2].id]
+        )
+        self.assertEqual(spaces[0].quoted_total, Decimal("750.00"))
+
+    def test_search_with_invalid_dates_lists_everything(self):
+        response = self.client.get(
+            reverse("rentals_category", args=["SHOP_M"]),
+            {"from_date": self.dates["from_date"], "to_date": self.dates["from_date"]},
+        )
+        self.assertIsNone(response.context["search"])
+        self.assertEqual(len(response.context["businessSpace"]), 4)
+        # the error is shown here, not left for the next page
+        self.assertContains(response, "Booking must be for at least 2 days")
+        response = self.client.get(reverse("login"))
+        self.assertNotContains(response, "Booking must be for at least 2 days")
+
+    def test_available_spaces_api(self):
+        response = self.client.get(
+            reverse("available_spaces", args=["SHOP_M"]), self.dates
+        )
+        data = response.json()
+        self.assertEqual(data["days"], 3)
+        self.assertEqual(
+            [(s["name"], s["total_cost"]) for s in data["spaces"]],
+            [("Shop M1", "750.00"), ("Shop M2", "750.00")],
+        )
+
+    def test_available_spaces_api_errors(self):
+        url = reverse("available_spaces", args=["SHOP_M"])
+        self.assertEqual(self.client.get(url).status_code, 400)
+        response = self.client.get(
+            reverse("available_spaces", args=["NOPE"]), self.dates
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_available_spaces_api_with_duplicate_category_codes(self):
+        Category.objects.create(
+            category="SHOP_M", description="Annex", cost_per_unit=Decimal("1.00")
+        )
+        response = self.client.get(
+            reverse("available_spaces", args=["SHOP_M"]), self.dates
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PUBLIC_HOLIDAYS=[])
+    def test_search_drops_spaces_that_bill_none_of_the_days(self):
+        BusinessSpace.objects.filter(pk=self.spaces[2].pk).update(
+            duration_type="Public Holidays"
+        )
+        response = self.client.get(
+            reverse("rentals_category", args=["SHOP_M"]), self.dates
+        )
+        self.assertEqual(
+            [space.id for space in response.context["businessSpace"]],
+            [self.spaces[1].id],
+        )
+        response = self.client.get(
+            reverse("available_spaces", args=["SHOP_M"]), self.dates
+        )
+        self.assertEqual([s["name"] for s in response.json()["spaces"]], ["Shop M1"])
+
+
+@override_settings(PUBLIC_HOLIDAYS=["2026-01-26", "2026-12-25", "2027-01-01"])
+class PricingTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(
+            category="MARKETING", description="Banners", cost_per_unit=Decimal("40.00")
+        )
+
+    def make_space(self, duration_type, rent_type="Day Wise", cost="100.00"):
+        return BusinessSpace.objects.create(
+            category=self.category,
+            name=f"Banner {duration_type}",
+            description="Banner",
+            duration_type=duration_type,
+            rent_type=rent_type,
+            cost=Decimal(cost),
+        )
+
+    def test_billable_days_match_calendar(self):
+        holidays = {date(2026, 1, 26), date(2026, 12, 25), date(2027, 1, 1)}
+        start, end = date(2025, 12, 20), date(2027, 2, 3)
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        expected = {
+            "All Days": len(days),
+            "Week Days": sum(d.weekday() < 5 and d not in holidays for d in days),
+            "Week Ends": sum(d.weekday() >= 5 for d in days),
+            "Public Holidays": sum(d in holidays for d in days),
+        }
+        for duration_type, count in expected.items():
+            self.assertEqual(
+                billable_days(duration_type, start, end, holidays), count
+            )
+
+    def test_quote_by_duration_type(self):
+        # Friday 2026-12-25 (holiday) to Monday 2026-12-28
+        from_date, to_date = date(2026, 12, 25), date(2026, 12, 28)
+        self.assertEqual(
+            quote(self.make_space("All Days"), from_date, to_date),
+            (4, 4, Decimal("400.00")),
+        )
+        self.assertEqual(
+            quote(self.make_space("Week Days"), from_date, to_date).total,
+            Decimal("100.00"),
+        )
+        self.assertEqual(
+            quote(self.make_space("Week Ends"), from_date, to_date).total,
+            Decimal("200.00"),
+        )
+        self.assertEqual(
+            quote(self.make_space("Public Holidays"), from_date, to_date).total,
+            Decimal("100.00"),
+        )
+
+    def test_quote_by_rent_type(self):
+        from_date, to_date = date(2026, 3, 2), date(2026, 3, 11)
+        week = self.make_space("All Days", rent_type="Week Wise", cost="500.00")
+        hour = self.make_space("All Days", rent_type="Hour Wise", cost="75.00")
+        self.assertEqual(quote(week, from_date, to_date).total, Decimal("1000.00"))
+        self.assertEqual(quote(hour, from_date, to_date).total, Decimal("18000.00"))
+        self.assertEqual(
+            quote(hour, from_date, from_date).total,
+            quote_slots(hour, from_date, 24, 60).total,
+        )
+
+    @override_settings(PUBLIC_HOLIDAYS=[])
+    def test_no_billable_days_cannot_be_booked(self):
+        space = self.make_space("Public Holidays")
+        from_date = date.today() + timedelta(days=1)
+        to_date = from_date + timedelta(days=6)
+        self.assertEqual(quote(space, from_date, to_date).billable_days, 0)
+
+        User.objects.create_user(username="testuser", password="testpass")
+        self.client.login(username="testuser", password="testpass")
+        response = self.client.post(
+            reverse("booking", kwargs={"space_id": space.id}),
+            {
+                "action": "confirm",
+                "from_date": from_date.isoformat(),
+                "to_date": to_date.isoformat(),
+            },
+        )
+        self.assertIn(
+            "rental days (Public Holidays)",
+            " ".join(str(message) for message in response.context["messages"]),
+        )
+        self.assertFalse(ReservationHold.objects.exists())
+
+    def test_quote_many_uses_category_rate_in_one_query(self):
+        for _ in range(3):
+            self.make_space("All Days", cost="0")
+        spaces = list(BusinessSpace.objects.all())
+        from_date, to_date = date(2026, 3, 2), date(2026, 3, 4)
+
+        with self.assertNumQueries(1):
+            quotes = quote_many((space, from_date, to_date) for space in spaces)
+        self.assertEqual([q.total for q in quotes], [Decimal("120.00")] * 3)
+
+
+class CheckoutHoldTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.other = User.objects.create_user(username="other", password="testpass")
+        category = Category.objects.create(
+            category="ATRIUM_S", description="Atrium", cost_per_unit=Decimal("500.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=category,
+            name="Atrium 2",
+            description="Launch slot",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("1000.00"),
+        )
+        self.from_date = date.today() + timedelta(days=3)
+        self.to_date = date.today() + timedelta(days=5)
+
+    def confirm(self):
+        return self.client.post(
+            reverse("booking", kwargs={"space_id": self.space.id}),
+            {
+                "action": "confirm",
+                "from_date": self.from_date.isoformat(),
+                "to_date": self.to_date.isoformat(),
+            },
+        )
+
+    def test_confirm_places_hold_and_payment_converts_it(self):
+        self.client.login(username="testuser", password="testpass")
+        self.assertRedirects(self.confirm(), reverse("payment_new"))
+        hold = ReservationHold.objects.get()
+        self.assertEqual(self.client.session["pending_booking"]["hold_id"], hold.id)
+        self.assertEqual(hold.total_cost, Decimal("3000.00"))
+
+        response = self.client.post(reverse("process_payment"))
+        self.assertEqual(response.status_code, 200)
+        booking = Booking.objects.get()
+        self.assertTrue(booking.is_paid)
+        self.assertEqual(booking.user, self.user)
+        self.assertFalse(ReservationHold.objects.exists())
+        self.assertNotIn("pending_booking", self.client.session)
+
+    def test_hold_blocks_other_users(self):
+        place_hold(
+            self.other, self.space, self.from_date, self.to_date, Decimal("3000.00")
+        )
+        self.client.login(username="testuser", password="testpass")
+        response = self.confirm()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ReservationHold.objects.count(), 1)
+
+        response = self.client.post(
+            reverse("booking", kwargs={"space_id": self.space.id}),
+            {
+                "action": "check",
+                "from_date": self.from_date.isoformat(),
+                "to_date": self.to_date.isoformat(),
+            },
+        )
+        self.assertFalse(response.context["available"])
+
+    def test_expired_hold_is_not_converted(self):
+        hold = place_hold(
+            self.user, self.space, self.from_date, self.to_date, Decimal("3000.00")
+        )
+        ReservationHold.objects.filter(pk=hold.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        with self.assertRaises(BookingConflict):
+            convert_hold(hold.id, self.user)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(ReservationHold.objects.exists())
+
+    def test_expired_holds_do_not_block_and_are_swept(self):
+        hold = place_hold(
+            self.other, self.space, self.from_date, self.to_date, Decimal("3000.00")
+        )
+        ReservationHold.objects.filter(pk=hold.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        place_hold(
+            self.user, self.space, self.from_date, self.to_date, Decimal("3000.00")
+        )
+        self.assertEqual(ReservationHold.objects.get().user, self.user)
+        self.assertEqual(sweep_expired_holds(), 0)
+
+    def test_hold_expiring_after_the_sweep_does_not_block(self):
+        hold = place_hold(
+            self.other, self.space, self.from_date, self.to_date, Decimal("3000.00")
+        )
+        ReservationHold.objects.filter(pk=hold.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        with mock.patch("spaces.holds.sweep_expired_holds"):
+            place_hold(
+                self.user, self.space, self.from_date, self.to_date, Decimal("3000.00")
+            )
+        self.assertEqual(ReservationHold.objects.get().user, self.user)
+
+
+class CheckoutContentionTest(TransactionTestCase):
+    THREADS = 8
+
+    def test_concurrent_checkouts_never_double_book(self):
+        category = Category.objects.create(
+            category="ATRIUM_NW", description="Atrium", cost_per_unit=Decimal("1.00")
+        )
+        space = BusinessSpace.objects.create(
+            category=category,
+            name="Flash launch",
+            description="Atrium slot",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("1000.00"),
+        )
+        users = [
+            User.objects.create_user(username=f"tenant{i}")
+            for i in range(self.THREADS)
+        ]
+        from_date = date.today() + timedelta(days=1)
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def checkout(user, offset):
+            # each tenant wants dates that overlap every other tenant's
+            start = from_date + timedelta(days=offset % 2)
+            barrier.wait()
+            try:
+                # SQLite reports lock contention as OperationalError; a
+                # client would retry the request
+                for attempt in range(20):
+                    try:
+                        hold = place_hold(
+                            user,
+                            space,
+                            start,
+                            start + timedelta(days=2),
+                            Decimal("3000.00"),
+                        )
+                        results.append(convert_hold(hold.id, user))
+                        return
+                    except OperationalError:
+                        time.sleep(0.01 * attempt)
+            except BookingConflict:
+                pass
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=checkout, args=(user, i))
+            for i, user in enumerate(users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(Booking.objects.filter(space=space).count(), 1)
+
+
+class BrowseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.category = Category.objects.create(
+            category="CINEMA", description="Cinema", cost_per_unit=Decimal("900.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=self.category,
+            name="Screen 1",
+            description="Cinema hall",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("2000.00"),
+        )
+
+    def test_browse_pages_serve_from_cache(self):
+        urls = [reverse("rentals"), reverse("rentals_category", args=["CINEMA"])]
+        for url in urls:
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_catalog_change_invalidates(self):
+        self.client.get(reverse("rentals"))
+        Category.objects.create(
+            category="MARKETING", description="Banners", cost_per_unit=Decimal("1")
+        )
+        response = self.client.get(reverse("rentals"))
+        self.assertEqual(len(response.context["category"]), 2)
+
+        url = reverse("rentals_category", args=["CINEMA"])
+        self.client.get(url)
+        self.space.name = "Screen One"
+        self.space.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context["businessSpace"][0].name, "Screen One")
+
+    def test_card_fragments_follow_data_versions(self):
+        url = reverse("rentals_category", args=["CINEMA"])
+        self.assertContains(self.client.get(url), "Screen 1")
+        self.space.name = "Screen One"
+        self.space.save()
+        response = self.client.get(url)
+        self.assertContains(response, "Screen One")
+        self.assertNotContains(response, "Screen 1-")
+
+    def test_new_booking_invalidates_listing(self):
+        url = reverse("rentals_category", args=["CINEMA"])
+        response = self.client.get(url)
+        self.assertEqual(response.context["businessSpace"][0].status, "available")
+        Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=date.today(),
+            to_date=date.today() + timedelta(days=3),
+            total_cost=Decimal("8000.00"),
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.context["businessSpace"][0].status, "booked")
+
+    def test_warm_cache_command(self):
+        call_command("warm_cache", stdout=StringIO())
+        with self.assertNumQueries(0):
+            self.client.get(reverse("rentals_category", args=["CINEMA"]))
+
+
+class ImageUploadTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.category = Category.objects.create(
+            category="SHOP_S", description="Small shop", cost_per_unit=Decimal("1")
+        )
+
+    def upload(self, filename, color="red"):
+        buffer = BytesIO()
+        Image.new("RGB", (1200, 800), color).save(buffer, "PNG")
+        return SimpleUploadedFile(filename, buffer.getvalue(), "image/png")
+
+    def create_space(self, image):
+        return BusinessSpace.objects.create(
+            category=self.category,
+            name="Shop",
+            description="Shop",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("100.00"),
+            image=image,
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.create_space(self.upload("shop101.png"))
+        second = self.create_space(self.upload("copy of shop101.PNG"))
+        other = self.create_space(self.upload("shop102.png", color="blue"))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertRegex(first.image.name, r"^uploads/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+
+    def test_webp_variants(self):
+        space = self.create_space(self.upload("shop.png"))
+        for width in VARIANT_WIDTHS:
+            path = space.image.storage.path(variant_name(space.image.name, width))
+            with Image.open(path) as variant:
+                self.assertEqual(variant.format, "WEBP")
+                self.assertEqual(variant.width, width)
+
+        self.assertEqual(
+            srcset(space.image),
+            ", ".join(
+                f"/images/{variant_name(space.image.name, width)} {width}w"
+                for width in VARIANT_WIDTHS
+            ),
+        )
+        self.assertTrue(thumbnail_url(space.image).endswith("_320w.webp"))
+        self.assertEqual(thumbnail_url(None), "")
+
+    def test_process_images_is_idempotent(self):
+        space = self.create_space(None)
+        os.makedirs(os.path.join(self.media_root, "uploads"))
+        with open(os.path.join(self.media_root, "uploads", "legacy.png"), "wb") as f:
+            f.write(self.upload("legacy.png").read())
+        BusinessSpace.objects.filter(pk=space.pk).update(image="uploads/legacy.png")
+
+        out = StringIO()
+        call_command("process_images", stdout=out)
+        self.assertIn("Renamed 1 image(s)", out.getvalue())
+        name = BusinessSpace.objects.get(pk=space.pk).image.name
+        self.assertRegex(name, r"^uploads/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+
+        out = StringIO()
+        call_command("process_images", stdout=out)
+        self.assertIn("Renamed 0 image(s)", out.getvalue())
+        self.assertEqual(BusinessSpace.objects.get(pk=space.pk).image.name, name)
+
+
+class StaticFilesMiddlewareTest(TestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        override = override_settings(STATIC_ROOT=self.static_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        os.makedirs(os.path.join(self.static_root, "css"))
+        self.css = b"body { color: black; }\n" * 100
+        self.write("css/style.0123456789ab.css", self.css)
+        self.write("css/style.0123456789ab.css.gz", gzip.compress(self.css))
+        self.write("robots.txt", b"User-agent: *\n")
+
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse("view"))
+        self.factory = RequestFactory()
+
+    def write(self, name, content):
+        with open(os.path.join(self.static_root, name), "wb") as file:
+            file.write(content)
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, headers=headers))
+
+    def test_serves_hashed_file_with_far_future_caching(self):
+        response = self.get("/static/css/style.0123456789ab.css")
+        self.assertEqual(b"".join(response.streaming_content), self.css)
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("immutable", response["Cache-Control"])
+
+        response = self.get("/static/robots.txt")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    def test_serves_precompressed_variant(self):
+        response = self.get(
+            "/static/css/style.0123456789ab.css", accept_encoding="gzip, br"
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), self.css
+        )
+
+    def test_range_requests(self):
+        url = "/static/css/style.0123456789ab.css"
+        response = self.get(url, range="bytes=5-9")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.css[5:10])
+        self.assertEqual(response["Content-Range"], f"bytes 5-9/{len(self.css)}")
+
+        response = self.get(url, range="bytes=-4")
+        self.assertEqual(b"".join(response.streaming_content), self.css[-4:])
+
+        response = self.get(url, range=f"bytes={len(self.css)}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_not_modified(self):
+        response = self.get(
+            "/static/robots.txt", if_modified_since="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_async_chain(self):
+        async def view(request):
+            return HttpResponse("view")
+
+        middleware = StaticFilesMiddleware(view)
+        response = await middleware(self.factory.get("/static/robots.txt"))
+        self.assertEqual(b"".join(response.streaming_content), b"User-agent: *\n")
+        response = await middleware(self.factory.get("/rentals/"))
+        self.assertEqual(response.content, b"view")
+
+    def test_unknown_and_unsafe_paths_fall_through(self):
+        self.assertEqual(self.get("/static/missing.css").content, b"view")
+        self.assertEqual(self.get("/static/../secret.txt").content, b"view")
+        self.assertEqual(self.get("/rentals/").content, b"view")
+
+    def test_collectstatic_writes_gzip_variants(self):
+        with override_settings(
+            STORAGES={
+                "staticfiles": {
+                    "BACKEND": "spaces.storage.CompressedManifestStaticFilesStorage"
+                }
+            },
+            INSTALLED_APPS=["django.contrib.staticfiles", "spaces"],
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            stored = staticfiles_storage.stored_name("css/style.css")
+
+        self.assertRegex(stored, r"^css/style\.[0-9a-f]{12}\.css$")
+        with gzip.open(os.path.join(self.static_root, stored + ".gz")) as file:
+            self.assertEqual(file.read(), staticfiles_storage.open(stored).read())
+
+
+class AsyncViewsTest(TestCase):
+    async_client_class = AsyncClient
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.category = Category.objects.create(
+            category="GAMING", description="Gaming", cost_per_unit=Decimal("300.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=self.category,
+            name="Arcade 1",
+            description="Arcade corner",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("300.00"),
+        )
+        Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=date.today(),
+            to_date=date.today() + timedelta(days=2),
+            total_cost=Decimal("900.00"),
+            is_paid=True,
+        )
+
+    async def test_browse_pages(self):
+        response = await self.async_client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.get(reverse("rentals"))
+        self.assertContains(response, "GAMING")
+
+        response = await self.async_client.get(
+            reverse("rentals_category", args=["GAMING"])
+        )
+        self.assertContains(response, "Arcade 1")
+        self.assertEqual(response.context["businessSpace"][0].status, "booked")
+
+    async def test_unknown_category_redirects(self):
+        response = await self.async_client.get(
+            reverse("rentals_category", args=["NOPE"])
+        )
+        self.assertRedirects(
+            response, reverse("rentals"), fetch_redirect_response=False
+        )
+
+    async def test_my_bookings(self):
+        response = await self.async_client.get(reverse("my_bookings"))
+        self.assertEqual(response.status_code, 302)
+
+        await self.async_client.alogin(username="testuser", password="testpass")
+        response = await self.async_client.get(reverse("my_bookings"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["bookings"]), 1)
+        self.assertContains(response, "Generate Invoice")
+
+
+class DbPoolMetricsTest(TestCase):
+    class FakePool:
+        def get_stats(self):
+            return {
+                "pool_min": 2,
+                "pool_max": 10,
+                "pool_size": 4,
+                "pool_available": 1,
+                "requests_num": 8,
+                "requests_wait_ms": 20,
+            }
+
+    def test_pool_stats(self):
+        self.assertIsNone(pool_stats())
+
+        connection.pool = self.FakePool()
+        self.addCleanup(delattr, connection, "pool")
+        stats = pool_stats()
+        self.assertEqual((stats["active"], stats["idle"]), (3, 1))
+        self.assertEqual(stats["wait_ms_avg"], 2.5)
+
+    def test_metrics_view_is_staff_only(self):
+        url = reverse("db_pool_metrics")
+        User.objects.create_user(username="user", password="pass")
+        User.objects.create_user(username="staff", password="pass", is_staff=True)
+
+        self.client.login(username="user", password="pass")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.login(username="staff", password="pass")
+        response = self.client.get(url)
+        self.assertEqual(response.json(), {"pooled": False, "pool": None})
+
+
+class SessionStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session["pending_booking"] = {"hold_id": 1, "days": 3}
+        session.save()
+        self.session_key = session.session_key
+
+    def test_unchanged_session_is_not_written(self):
+        session = SessionStore(self.session_key)
+        with self.assertNumQueries(0):
+            session["pending_booking"] = {"hold_id": 1, "days": 3}
+            session.save()
+
+        session["pending_booking"] = {"hold_id": 2, "days": 3}
+        session.save()
+        cache.clear()
+        session = SessionStore(self.session_key)
+        self.assertEqual(session["pending_booking"]["hold_id"], 2)
+
+    def test_purge_sessions_in_batches(self):
+        Session.objects.all().delete()
+        past = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f"expired{i}", session_data="", expire_date=past)
+            for i in range(5)
+        )
+        SessionStore().create()
+
+        out = StringIO()
+        call_command("purge_sessions", batch_size=2, stdout=out)
+        self.assertIn("Deleted 5", out.getvalue())
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class EmailOrUsernameBackendTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="Asha", email="asha@example.com", password="first"
+        )
+        User.objects.create_user(
+            username="asha-shop", email="ASHA@example.com", password="second"
+        )
+        self.backend = EmailOrUsernameBackend()
+
+    def test_login_with_username_or_email(self):
+        for username in ["asha", "Asha@Example.com"]:
+            response = self.client.post(
+                reverse("login"), {"username": username, "password": "first"}
+            )
+            self.assertRedirects(response, reverse("home"))
+            self.client.logout()
+
+    def test_shared_email_matches_by_password(self):
+        user = self.backend.authenticate(
+            None, username="asha@example.com", password="second"
+        )
+        self.assertEqual(user.username, "asha-shop")
+        self.assertIsNone(
+            self.backend.authenticate(None, username="asha@example.com", password="x")
+        )
+        self.assertIsNone(
+            self.backend.authenticate(None, username="nobody", password="first")
+        )
+
+    @override_settings(AUTH_USER_CACHE=True)
+    def test_cached_user_is_dropped_on_save_and_logout(self):
+        self.backend.get_user(self.user.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.id), self.user)
+
+        self.user.set_password("changed")
+        self.user.save()
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(self.user.id)
+        self.assertTrue(user.check_password("changed"))
+
+        self.client.login(username="Asha", password="changed")
+        self.client.get(reverse("home"))
+        self.client.logout()
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.id)
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Every URL in spaces/urls.py stays within a fixed number of queries.
+
+    The budgets are checked again by LargeQueryBudgetTest on a data set ten
+    times larger, so a view whose query count grows with rows fails there.
+    Caches are cleared first, so the budgets cover a cold request.
+    """
+
+    scale = 1
+
+    # url name -> (logged in user, query budget)
+    BUDGETS = {
+        "home": (None, 0),
+        "login": (None, 0),
+        "logout": ("customer", 4),
+        "register": (None, 0),
+        "rentals": (None, 2),
+        "rentals_category": (None, 3),
+        "available_spaces": (None, 3),
+        "booking": ("customer", 4),
+        "availability": (None, 2),
+        "process_payment": ("customer", 2),
+        "my_bookings": ("customer", 3),
+        "my_bookings_more": ("customer", 3),
+        "invoice": ("customer", 4),
+        "payment_new": ("customer", 2),
+        "db_pool_metrics": ("staff", 2),
+        "metrics": ("staff", 2),
+        "api_categories": (None, 1),
+        "api_category_spaces": (None, 2),
+        "api_space": (None, 2),
+        "api_space_availability": (None, 2),
+    }
+
+    def setUp(self):
+        self.data = seed_dataset(self.scale)
+
+    def url_args(self, name):
+        pattern = next(p for p in urls.urlpatterns if p.name == name)
+        args = {
+            "category": self.data.category.category,
+            "space_id": self.data.space.id,
+            "booking_id": self.data.booking.id,
+        }
+        return {key: args[key] for key in pattern.pattern.converters}
+
+    def test_url_budgets(self):
+        names = [pattern.name for pattern in urls.urlpatterns]
+        self.assertCountEqual(names, self.BUDGETS)
+
+        from_date = date.today() + timedelta(days=30)
+        query = {
+            "from_date": from_date.isoformat(),
+            "to_date": (from_date + timedelta(days=3)).isoformat(),
+        }
+        for name, (user, budget) in self.BUDGETS.items():
+            with self.subTest(url=name):
+                url = reverse(name, kwargs=self.url_args(name))
+                self.client.logout()
+                if user:
+                    self.client.force_login(getattr(self.data, user))
+                cache.clear()
+                with self.assertMaxQueries(budget, f"GET {url}"):
+                    response = self.client.get(url, query)
+                self.assertLess(response.status_code, 500)
+
+
+class LargeQueryBudgetTest(QueryBudgetTest):
+    scale = 10
+
+
+class MyBookingsPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="agency", password="pass")
+        category = Category.objects.create(
+            category="EVENT", description="Events", cost_per_unit=Decimal("100.00")
+        )
+        space = BusinessSpace.objects.create(
+            category=category,
+            name="Hall",
+            description="Event hall",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("100.00"),
+        )
+        start = date.today()
+        Booking.objects.bulk_create(
+            Booking(
+                user=self.user,
+                space=space,
+                from_date=start + timedelta(days=3 * i),
+                to_date=start + timedelta(days=3 * i + 1),
+                total_cost=Decimal("200.00"),
+                is_paid=i % 2 == 0,
+            )
+            for i in range(45)
+        )
+        self.client.login(username="agency", password="pass")
+
+    def test_pages_cover_every_booking_once(self):
+        response = self.client.get(reverse("my_bookings"))
+        seen = [booking.id for booking in response.context["bookings"]]
+        self.assertContains(response, "Load more")
+        self.assertContains(response, reverse("payment_new"))
+
+        before = response.context["next_before"]
+        while before:
+            response = self.client.get(reverse("my_bookings_more"), {"before": before})
+            self.assertNotContains(response, "<html")
+            seen += [booking.id for booking in response.context["bookings"]]
+            before = response.context["next_before"]
+
+        self.assertEqual(len(seen), 45)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_page_queries_do_not_grow(self):
+        cache.clear()
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("my_bookings"))
+        self.assertEqual(len(response.context["bookings"]), 20)
+
+    def test_bad_cursor_starts_over(self):
+        response = self.client.get(reverse("my_bookings_more"), {"before": "x-y"})
+        self.assertEqual(len(response.context["bookings"]), 20)
+
+
+class BookingExportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="finance", email="finance@example.com", password="pass"
+        )
+        category = Category.objects.create(
+            category="KIOSK", description="Kiosks", cost_per_unit=Decimal("50.00")
+        )
+        space = BusinessSpace.objects.create(
+            category=category,
+            name="Kiosk 1",
+            description="Mall kiosk",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("50.00"),
+        )
+        start = date.today()
+        self.bookings = Booking.objects.bulk_create(
+            Booking(
+                user=self.user,
+                space=space,
+                from_date=start + timedelta(days=3 * i),
+                to_date=start + timedelta(days=3 * i + 1),
+                total_cost=Decimal("100.00"),
+                is_paid=i < 3,
+            )
+            for i in range(4)
+        )
+        # an invoice from last year falls outside a date filter
+        Booking.objects.filter(id=self.bookings[0].id).update(
+            created_at=timezone.now() - timedelta(days=400)
+        )
+
+    def test_csv_to_stdout(self):
+        out = StringIO()
+        call_command("export_bookings", stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1]["invoice_number"], f"INV-{self.bookings[1].id:05d}")
+        self.assertEqual(rows[1]["category"], "KIOSK")
+        self.assertEqual(rows[1]["days"], "2")
+
+    def test_jsonl_filters(self):
+        out = StringIO()
+        since = (date.today() - timedelta(days=30)).isoformat()
+        call_command(
+            "export_bookings", "--format=jsonl", "--paid", "--from", since, stdout=out
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [row["booking_id"] for row in rows], [b.id for b in self.bookings[1:3]]
+        )
+
+    def test_invoice_zip(self):
+        target = os.path.join(tempfile.mkdtemp(), "invoices.zip")
+        self.addCleanup(shutil.rmtree, os.path.dirname(target))
+        call_command(
+            "export_bookings",
+            "--format=zip",
+            "--unpaid",
+            "-o",
+            target,
+            stderr=StringIO(),
+        )
+        with zipfile.ZipFile(target) as archive:
+            name = f"INV-{self.bookings[3].id:05d}.html"
+            self.assertEqual(archive.namelist(), [name])
+            self.assertIn("Kiosk 1", archive.read(name).decode())
+
+    def test_admin_action_streams(self):
+        User.objects.create_superuser(username="admin", password="pass")
+        self.client.login(username="admin", password="pass")
+        response = self.client.post(
+            reverse("admin:spaces_booking_changelist"),
+            {
+                "action": "export_csv",
+                "_selected_action": [b.id for b in self.bookings[:2]],
+            },
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(content.strip().splitlines()), 3)
+
+    def test_invoice_date_is_local(self):
+        # 01:30 in Asia/Kolkata is still the previous day in UTC
+        created = datetime(2026, 3, 1, 20, 0, tzinfo=UTC)
+        Booking.objects.filter(id=self.bookings[1].id).update(created_at=created)
+        out = StringIO()
+        call_command(
+            "export_bookings", "--from", "2026-03-02", "--to", "2026-03-02", stdout=out
+        )
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(
+            [(row["booking_id"], row["invoice_date"]) for row in rows],
+            [(str(self.bookings[1].id), "2026-03-02")],
+        )
+
+    def test_admin_action_streams_under_asgi(self):
+        admin = User.objects.create_superuser(username="admin", password="pass")
+        self.client.force_login(admin)
+        # the test client keeps connections open across requests; so must this
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        csrf = "a" * 32
+        cookies = (
+            f"{settings.SESSION_COOKIE_NAME}="
+            f"{self.client.cookies[settings.SESSION_COOKIE_NAME].value}; "
+            f"{settings.CSRF_COOKIE_NAME}={csrf}"
+        )
+        body = urlencode(
+            {
+                "action": "export_invoices",
+                "_selected_action": [b.id for b in self.bookings],
+                "csrfmiddlewaretoken": csrf,
+            },
+            doseq=True,
+        ).encode()
+        path = reverse("admin:spaces_booking_changelist")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", cookies.encode()),
+                (b"content-type", b"application/x-www-form-urlencoded"),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+        messages = []
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()
+
+        async def send(message):
+            messages.append(message)
+
+        with (
+            mock.patch("spaces.exports.ASYNC_BATCH_SIZE", 1),
+            warnings.catch_warnings(),
+        ):
+            # Django warns when it has to buffer a synchronous iterator
+            warnings.simplefilter("error")
+            async_to_sync(ASGIHandler())(scope, receive, send)
+
+        self.assertEqual(messages[0]["status"], 200)
+        chunks = [m["body"] for m in messages[1:] if m.get("body")]
+        # one chunk per invoice and the central directory, sent as produced
+        self.assertEqual(len(chunks), len(self.bookings) + 1)
+        with zipfile.ZipFile(BytesIO(b"".join(chunks))) as archive:
+            self.assertEqual(len(archive.namelist()), len(self.bookings))
+
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="pass")
+        self.client.force_login(self.admin)
+        self.category = Category.objects.create(
+            category="SHOP_L", description="Large", cost_per_unit=Decimal("10.00")
+        )
+
+    def add_bookings(self, count):
+        spaces = BusinessSpace.objects.bulk_create(
+            BusinessSpace(
+                category=self.category,
+                name=f"Shop {BusinessSpace.objects.count() + i}",
+                description="Shop",
+                duration_type="All Days",
+                rent_type="Day Wise",
+                cost=Decimal("10.00"),
+            )
+            for i in range(count)
+        )
+        Booking.objects.bulk_create(
+            Booking(
+                user=self.admin,
+                space=space,
+                from_date=date.today(),
+                to_date=date.today() + timedelta(days=1),
+                total_cost=Decimal("20.00"),
+            )
+            for space in spaces
+        )
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for name in ["booking", "businessspace"]:
+            with self.subTest(model=name):
+                url = reverse(f"admin:spaces_{name}_changelist")
+                self.add_bookings(3)
+                small = self.changelist_queries(url)
+                self.add_bookings(30)
+                self.assertEqual(self.changelist_queries(url), small)
+
+    def test_change_form_uses_lookup_widgets(self):
+        self.add_bookings(1)
+        booking = Booking.objects.get()
+        response = self.client.get(
+            reverse("admin:spaces_booking_change", args=[booking.id])
+        )
+        self.assertContains(response, "vForeignKeyRawIdAdminField")
+        self.assertContains(response, "admin-autocomplete")
+
+    def test_spaces_are_shown_by_name(self):
+        self.add_bookings(1)
+        response = self.client.get(reverse("admin:spaces_booking_changelist"))
+        self.assertContains(response, "Shop 0")
+        self.assertNotContains(response, "BusinessSpace object")
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "spaces",
+                "model_name": "booking",
+                "field_name": "space",
+                "term": "Shop",
+            },
+        )
+        self.assertEqual(
+            [result["text"] for result in response.json()["results"]], ["Shop 0"]
+        )
+
+
+class OccupancyRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.shops = Category.objects.create(
+            category="SHOP_S", description="Shops", cost_per_unit=Decimal("10.00")
+        )
+        self.screens = Category.objects.create(
+            category="CINEMA", description="Cinema", cost_per_unit=Decimal("10.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=self.shops,
+            name="Shop 1",
+            description="Shop",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("100.00"),
+        )
+        self.booking = Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=date(2030, 1, 30),
+            to_date=date(2030, 2, 1),
+            total_cost=Decimal("100.00"),
+        )
+
+    def rows(self):
+        return list(
+            DailyOccupancy.objects.order_by("day").values_list("day", "revenue")
+        )
+
+    def test_booking_writes_update_rollup(self):
+        self.assertEqual(
+            self.rows(),
+            [
+                (date(2030, 1, 30), Decimal("33.33")),
+                (date(2030, 1, 31), Decimal("33.33")),
+                (date(2030, 2, 1), Decimal("33.34")),
+            ],
+        )
+
+        self.booking.to_date = date(2030, 1, 31)
+        self.booking.save()
+        self.assertEqual(
+            self.rows(),
+            [
+                (date(2030, 1, 30), Decimal("50.00")),
+                (date(2030, 1, 31), Decimal("50.00")),
+            ],
+        )
+
+        self.space.category = self.screens
+        self.space.save()
+        self.assertEqual(
+            set(DailyOccupancy.objects.values_list("category", flat=True)),
+            {self.screens.id},
+        )
+
+        self.booking.delete()
+        self.assertEqual(self.rows(), [])
+
+    def test_integer_cost_and_inverted_dates(self):
+        Booking.objects.filter(pk=self.booking.pk).delete()
+        Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=date(2030, 3, 1),
+            to_date=date(2030, 3, 2),
+            total_cost=1,
+        )
+        self.assertEqual(
+            self.rows(),
+            [(date(2030, 3, 1), Decimal("0.50")), (date(2030, 3, 2), Decimal("0.50"))],
+        )
+
+        inverted = Booking(
+            user=self.user,
+            space=self.space,
+            from_date=date(2030, 4, 2),
+            to_date=date(2030, 4, 1),
+            total_cost=Decimal("10.00"),
+        )
+        with self.assertRaises(ValidationError):
+            inverted.full_clean()
+        inverted.save()
+        self.assertFalse(DailyOccupancy.objects.filter(booking=inverted).exists())
+
+    def test_rebuild_after_bulk_insert(self):
+        Booking.objects.bulk_create(
+            [
+                Booking(
+                    user=self.user,
+                    space=self.space,
+                    from_date=date(2030, 3, 1),
+                    to_date=date(2030, 3, 2),
+                    total_cost=Decimal("40.00"),
+                )
+            ]
+        )
+        self.assertEqual(DailyOccupancy.objects.count(), 3)
+        out = StringIO()
+        call_command("rebuild_rollups", chunk_size=2, stdout=out)
+        self.assertIn("Wrote 5 rollup row(s)", out.getvalue())
+
+    def test_reports(self):
+        # the space count and one aggregate over the rollup
+        with self.assertNumQueries(2):
+            months = by_month(2030)
+        self.assertEqual(
+            [(row["month"].month, row["booked_days"]) for row in months],
+            [(1, 2), (2, 1)],
+        )
+        self.assertEqual(months[0]["occupancy"], round(2 * 100 / 31, 1))
+
+        categories = by_category(date(2030, 1, 1), date(2030, 1, 31))
+        self.assertEqual(categories[0]["category"], "SHOP_S")
+        self.assertEqual(categories[0]["revenue"], Decimal("66.66"))
+
+        rent_types = by_rent_type(date(2030, 1, 1), date(2030, 12, 31))
+        self.assertEqual(rent_types[0]["rent_type"], "Day Wise")
+        self.assertEqual(rent_types[0]["revenue"], Decimal("100.00"))
+
+    def test_admin_dashboard(self):
+        User.objects.create_superuser(username="admin", password="pass")
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(
+            reverse("admin:spaces_dailyoccupancy_changelist"), {"year": 2030}
+        )
+        self.assertContains(response, "SHOP_S")
+        self.assertContains(response, "January")
+
+
+class BookingImportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tenant", password="pass")
+        category = Category.objects.create(
+            category="SHOP_S", description="Shops", cost_per_unit=Decimal("10.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=category,
+            name="Shop 1",
+            description="Shop",
+            duration_type="All Days",
+            rent_type="Day Wise",
+            cost=Decimal("100.00"),
+        )
+        self.existing = Booking.objects.create(
+            user=self.user,
+            space=self.space,
+            from_date=date(2030, 1, 10),
+            to_date=date(2030, 1, 12),
+            total_cost=Decimal("300.00"),
+        )
+
+    def run_import(self, text, **options):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "bookings.csv")
+        report = os.path.join(directory, "rejected.csv")
+        with open(path, "w") as file:
+            file.write(text)
+        out = StringIO()
+        call_command("import_bookings", path, report=report, stdout=out, **options)
+        with open(report) as file:
+            rejected = {int(row["line"]): row["reason"] for row in csv.DictReader(file)}
+        return out.getvalue(), rejected
+
+    def test_import_resolves_conflicts(self):
+        space = self.space.id
+        output, rejected = self.run_import(
+            "space,user,from_date,to_date,total_cost,is_paid\n"
+            f"{space},tenant,2030-01-01,2030-01-03,300,true\n"
+            f"{space},tenant,2030-01-03,2030-01-04,200,true\n"
+            f"{space},tenant,2030-01-08,2030-01-10,300,false\n"
+            f"{space},tenant,2030-01-11,2030-01-11,100,false\n"
+            f"{space},tenant,2030-01-13,2030-01-15,300,yes\n"
+            f"{space},nobody,2030-02-01,2030-02-02,200,\n"
+            f"999,tenant,2030-02-01,2030-02-02,200,\n"
+            f"{space},tenant,2030-02-05,2030-02-01,200,\n"
+            f"{space},tenant,2030-03-01,2030-03-02,NaN,\n"
+        )
+        self.assertIn("Imported 2 of 9 row(s), rejected 7", output)
+        self.assertEqual(
+            rejected,
+            {
+                3: "overlaps line 2",
+                4: f"overlaps booking {self.existing.id}",
+                5: f"overlaps booking {self.existing.id}",
+                7: "unknown user",
+                8: "unknown space",
+                9: "to_date is before from_date",
+                10: "invalid total_cost",
+            },
+        )
+        imported = Booking.objects.exclude(pk=self.existing.pk).order_by("from_date")
+        self.assertEqual(
+            [(booking.from_date, booking.is_paid) for booking in imported],
+            [(date(2030, 1, 1), True), (date(2030, 1, 13), True)],
+        )
+        # bulk writes bypass signals; the import adds the rollup rows itself
+        self.assertEqual(DailyOccupancy.objects.count(), 9)
+
+    def test_dry_run_writes_nothing(self):
+        output, rejected = self.run_import(
+            '{"space": %d, "user": "tenant", "from_date": "2030-03-01", '
+            '"to_date": "2030-03-02", "total_cost": "200"}\nnot json\n' % self.space.id,
+            import_format="jsonl",
+            dry_run=True,
+        )
+        self.assertIn("Would import 1 of 2 row(s), rejected 1", output)
+        self.assertEqual(rejected, {2: "not a JSON object"})
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+INSTRUMENTED_TEMPLATES = [
+    {**settings.TEMPLATES[0], "BACKEND": "spaces.instrumentation.TimedDjangoTemplates"}
+]
+
+
+@override_settings(
+    MIDDLEWARE=["spaces.middleware.InstrumentationMiddleware"] + settings.MIDDLEWARE,
+    TEMPLATES=INSTRUMENTED_TEMPLATES,
+    INSTRUMENTATION_SLOW_MS=60000,
+)
+class InstrumentationTest(TestCase):
+    def setUp(self):
+        instrumentation.reset()
+        self.addCleanup(instrumentation.reset)
+        self.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        self.client.force_login(self.staff)
+
+    def test_server_timing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("invoice", args=[999]))
+        header = response.headers["Server-Timing"]
+        self.assertIn(f'desc="{len(queries)} queries"', header)
+        self.assertRegex(header, r"tpl;dur=[\d.]+, total;dur=[\d.]+$")
+
+    def test_template_time_in_async_view(self):
+        response = self.client.get(reverse("rentals"))
+        template_ms = re.search(r"tpl;dur=([\d.]+)", response["Server-Timing"])
+        self.assertGreater(float(template_ms.group(1)), 0)
+
+    def test_slow_request_log(self):
+        with self.settings(INSTRUMENTATION_SLOW_MS=0):
+            with self.assertLogs("spaces.performance", "WARNING") as logs:
+                self.client.get(reverse("my_bookings"))
+        record = json.loads(logs.records[0].args[0])
+        self.assertEqual(record["view"], "my_bookings")
+        self.assertEqual(record["status"], 200)
+        self.assertLessEqual(len(record["queries"]), 5)
+        self.assertGreaterEqual(record["sql_count"], len(record["queries"]))
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("rentals"))
+        self.client.get(reverse("rentals"))
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response["Content-Type"].split(";")[0], "text/plain")
+        body = response.content.decode()
+        self.assertIn('spaces_request_duration_seconds_count{view="rentals"} 2', body)
+        self.assertIn('spaces_request_queries_total{view="rentals"}', body)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 302)
+        with self.settings(INSTRUMENTATION_METRICS_TOKEN="secret"):
+            response = self.client.get(
+                reverse("metrics"), headers={"Authorization": "Bearer secret"}
+            )
+        self.assertEqual(response.status_code, 200)
+
+
+class ApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.data = seed_dataset(scale=6)
+
+    def test_etag_answers_304_without_queries(self):
+        url = reverse("api_categories")
+        response = self.client.get(url)
+        self.assertEqual(
+            [row["code"] for row in response.json()["results"]],
+            ["SHOP_S", "SHOP_M", "CINEMA"],
+        )
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        self.data.category.description = "Small shops"
+        self.data.category.save()
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_category_spaces_cursor(self):
+        url = reverse("api_category_spaces", args=["SHOP_S"])
+        seen = []
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(space["id"] for space in body["results"])
+            url = body["next"]
+        expected = BusinessSpace.objects.filter(category__category="SHOP_S")
+        self.assertEqual(seen, sorted(expected.values_list("id", flat=True)))
+
+        url = reverse("api_category_spaces", args=["SHOP_S"])
+        self.assertEqual(self.client.get(url, {"cursor": "%%"}).status_code, 400)
+        missing = reverse("api_category_spaces", args=["NOPE"])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_space_detail_and_availability(self):
+        booking = self.data.booking
+        body = self.client.get(reverse("api_space", args=[booking.space_id])).json()
+        self.assertEqual(
+            body["booked"],
+            [[booking.from_date.isoformat(), booking.to_date.isoformat()]],
+        )
+
+        url = reverse("api_space_availability", args=[booking.space_id])
+        body = self.client.get(
+            url,
+            {
+                "from_date": booking.to_date.isoformat(),
+                "to_date": (booking.to_date + timedelta(days=2)).isoformat(),
+            },
+        ).json()
+        self.assertFalse(body["available"])
+        body = self.client.get(
+            url,
+            {
+                "from_date": (booking.to_date + timedelta(days=1)).isoformat(),
+                "to_date": (booking.to_date + timedelta(days=2)).isoformat(),
+            },
+        ).json()
+        self.assertTrue(body["available"])
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.post(url).status_code, 405)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.data = seed_dataset()
+
+    def test_anonymous_browse_pages_are_public(self):
+        url = reverse("rentals")
+        response = self.client.get(url)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("s-maxage=60", response["Cache-Control"])
+        self.assertIn("Cookie", response["Vary"])
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(cached.status_code, 304)
+
+        self.data.category.save()
+        changed = self.client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(changed.status_code, 200)
+
+    def test_category_page_changes_with_bookings(self):
+        url = reverse("rentals_category", args=[self.data.category.category])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(
+            self.client.get(url, headers={"If-None-Match": etag}).status_code, 304
+        )
+
+        # a delete leaves the newest timestamp alone; the row count moves
+        self.data.booking.delete()
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        # so no Last-Modified is sent, and If-Modified-Since alone never
+        # revalidates a page
+        self.assertFalse(response.has_header("Last-Modified"))
+        since = self.client.get(
+            url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+        )
+        self.assertEqual(since.status_code, 200)
+
+    def test_signed_in_pages_are_private(self):
+        self.client.force_login(self.data.customer)
+        url = reverse("invoice", args=[self.data.booking.id])
+        response = self.client.get(url)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("no-cache", response["Cache-Control"])
+        etag = response["ETag"]
+        self.assertEqual(
+            self.client.get(url, headers={"If-None-Match": etag}).status_code, 304
+        )
+
+        self.data.booking.is_paid = not self.data.booking.is_paid
+        self.data.booking.save()
+        self.assertEqual(
+            self.client.get(url, headers={"If-None-Match": etag}).status_code, 200
+        )
+
+
+class SlotBookingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.other = User.objects.create_user(username="other", password="testpass")
+        category = Category.objects.create(
+            category="CINEMA", description="Cinema", cost_per_unit=Decimal("500.00")
+        )
+        self.space = BusinessSpace.objects.create(
+            category=category,
+            name="Screen 3",
+            description="Private screening",
+            duration_type="All Days",
+            rent_type="Hour Wise",
+            cost=Decimal("250.00"),
+        )
+        self.day = date.today() + timedelta(days=3)
+
+    def book(self, user, slots):
+        mask = slot_mask(slots)
+        hold = place_slot_hold(user, self.space, self.day, mask, Decimal("1.00"))
+        return convert_hold(hold.id, user)
+
+    def test_masks(self):
+        self.assertEqual(slot_mask([9, 10]), 0b11 << 9)
+        self.assertEqual(slot_indexes(slot_mask([9, 10, 14])), [9, 10, 14])
+        self.assertEqual(describe(slot_mask([9, 10, 14])), "09:00-11:00, 14:00-15:00")
+        self.assertEqual(describe(slot_mask([23])), "23:00-24:00")
+        with self.assertRaises(ValueError):
+            slot_mask([24])
+
+    @override_settings(SPACES_SLOT_MINUTES=30)
+    def test_slot_length_setting(self):
+        self.assertEqual(describe(slot_mask([19])), "09:30-10:00")
+        self.assertEqual(
+            quote_slots(self.space, self.day, 3, 30).total, Decimal("375.00")
+        )
+        with override_settings(SPACES_SLOT_MINUTES=7):
+            with self.assertRaises(ImproperlyConfigured):
+                slot_mask([1])
+
+    def test_checkout_takes_slots(self):
+        self.client.login(username="testuser", password="testpass")
+        url = reverse("booking", kwargs={"space_id": self.space.id})
+        data = {"action": "check", "day": self.day.isoformat(), "slots": ["9", "10"]}
+
+        response = self.client.post(url, data)
+        self.assertTemplateUsed(response, "booking_slots.html")
+        self.assertTrue(response.context["available"])
+        self.assertEqual(response.context["total_cost"], Decimal("500.00"))
+
+        data["action"] = "confirm"
+        self.assertRedirects(self.client.post(url, data), reverse("payment_new"))
+        self.assertContains(self.client.get(reverse("payment_new")), "09:00-11:00")
+        self.client.post(reverse("process_payment"))
+
+        booking = Booking.objects.get()
+        self.assertEqual((booking.slot_mask, booking.total_cost), (0b11 << 9, 500))
+        self.assertEqual(SlotDay.objects.get().mask, 0b11 << 9)
+
+        response = self.client.get(url, {"day": self.day.isoformat()})
+        free = {index: is_free for index, _, is_free in response.context["slots"]}
+        self.assertEqual(
+            [free[8], free[9], free[10], free[11]], [True, False, False, True]
+        )
+
+    def test_slot_bookings_share_a_day(self):
+        self.book(self.user, [9, 10])
+        self.book(self.other, [11])
+        self.assertEqual(SlotDay.objects.get().mask, 0b111 << 9)
+
+        with self.assertRaises(BookingConflict):
+            self.book(self.other, [10, 11])
+
+        # the atomic update refuses overlapping bits even without the checks
+        self.assertFalse(reserve(self.space.id, self.day, slot_mask([10])))
+        self.assertTrue(reserve(self.space.id, self.day, slot_mask([12])))
+
+    def test_free_slots_in_one_query(self):
+        self.book(self.user, [9])
+        with self.assertNumQueries(1):
+            self.assertEqual(taken_mask(self.space, self.day), 1 << 9)
+
+    def test_whole_day_booking_blocks_every_slot(self):
+        Booking.objects.create(
+            user=self.other,
+            space=self.space,
+            from_date=self.day,
+            to_date=self.day,
+            total_cost=Decimal("1.00"),
+        )
+        self.assertEqual(taken_mask(self.space, self.day), full_day())
+        with self.assertRaises(BookingConflict):
+            self.book(self.user, [9])
+
+    def test_slot_holds_block_overlapping_slots_only(self):
+        place_slot_hold(
+            self.other, self.space, self.day, slot_mask([9]), Decimal("1.00")
+        )
+        with self.assertRaises(BookingConflict):
+            place_slot_hold(
+                self.user, self.space, self.day, slot_mask([9, 10]), Decimal("1.00")
+            )
+        place_slot_hold(
+            self.user, self.space, self.day, slot_mask([10]), Decimal("1.00")
+        )
+        with self.assertRaises(BookingConflict):
+            place_hold(self.user, self.space, self.day, self.day, Decimal("1.00"))
+
+    def test_deleting_a_booking_frees_its_slots(self):
+        self.book(self.user, [9, 10]).delete()
+        self.assertEqual(SlotDay.objects.get().mask, 0)
+        self.book(self.other, [10])
+
+    def test_rollup_counts_part_of_the_day(self):
+        self.book(self.user, [9, 10, 11])
+        self.assertEqual(DailyOccupancy.objects.get().share, Decimal("0.125"))
+        rent_types = by_rent_type(self.day, self.day)
+        self.assertEqual(rent_types[0]["booked_days"], Decimal("0.125"))
+
+    def test_slot_bookings_leave_the_day_free_in_listings(self):
+        self.book(self.user, [9, 10])
+        spaces = BusinessSpace.objects.with_booked_till()
+        self.assertIsNone(spaces.get().booked_till)
+        self.assertTrue(spaces.free_between(self.day, self.day).exists())
+        self.assertEqual(space_availability(self.space)["booked"], [])
+
+        response = self.client.get(reverse("api_space", args=[self.space.id]))
+        self.assertEqual(response.json()["booked"], [])
+        response = self.client.get(
+            reverse("api_space_availability", args=[self.space.id]),
+            {
+                "from_date": self.day.isoformat(),
+                "to_date": (self.day + timedelta(days=1)).isoformat(),
+            },
+        )
+        self.assertTrue(response.json()["available"])
+
+    def test_started_slots_cannot_be_booked(self):
+        today = timezone.localdate()
+        half_past_nine = datetime(today.year, today.month, today.day, 9, 30)
+        self.assertEqual(
+            past_mask(today, timezone.make_aware(half_past_nine)),
+            slot_mask(range(10)),
+        )
+        with self.assertRaises(BookingConflict):
+            place_slot_hold(
+                self.user, self.space, today, slot_mask([0]), Decimal("1.00")
+            )
+
+        self.client.login(username="testuser", password="testpass")
+        response = self.client.post(
+            reverse("booking", kwargs={"space_id": self.space.id}),
+            {"action": "confirm", "day": today.isoformat(), "slots": ["0"]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ReservationHold.objects.exists())
+
+    def test_expired_slot_hold_does_not_block(self):
+        hold = place_slot_hold(
+            self.other, self.space, self.day, slot_mask([9]), Decimal("1.00")
+        )
+        ReservationHold.objects.filter(pk=hold.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        with mock.patch("spaces.holds.sweep_expired_holds"):
+            place_slot_hold(
+                self.user, self.space, self.day, slot_mask([9]), Decimal("1.00")
+            )
+
+    @override_settings(PUBLIC_HOLIDAYS=[])
+    def test_no_billable_day_cannot_be_booked(self):
+        BusinessSpace.objects.filter(pk=self.space.pk).update(
+            duration_type="Public Holidays"
+        )
+        self.client.login(username="testuser", password="testpass")
+        response = self.client.post(
+            reverse("booking", kwargs={"space_id": self.space.id}),
+            {"action": "confirm", "day": self.day.isoformat(), "slots": ["9"]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ReservationHold.objects.exists())
+
+    def test_admin_cannot_move_slot_bookings(self):
+        booking = self.book(self.user, [9])
+        User.objects.create_superuser(username="admin", password="pass")
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(
+            reverse("admin:spaces_booking_change", args=[booking.id])
+        )
+        fields = response.context["adminform"].form.fields
+        self.assertNotIn("from_date", fields)
+        self.assertNotIn("space", fields)
+        self.assertIn("is_paid", fields)
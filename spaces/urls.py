@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("", views.home, name="home"),
@@ -9,14 +9,34 @@ urlpatterns = [
     path("register/", views.register, name="register"),
     path("rentals/", views.rentals, name="rentals"),
     path("rentals/<str:category>/", views.rentalsview, name="rentals_category"),
+    path(
+        "rentals/<str:category>/available/",
+        views.available_spaces,
+        name="available_spaces",
+    ),
     path("booking/<int:space_id>/", views.booking, name="booking"),
     path(
-        "process-payment/<int:booking_id>/",
-        views.process_payment,
-        name="process_payment",
-    ),  #
+        "booking/<int:space_id>/availability/",
+        views.availability,
+        name="availability",
+    ),
     path("my-bookings/", views.my_bookings, name="my_bookings"),  #
+    path("my-bookings/more/", views.my_bookings_more, name="my_bookings_more"),
     path("invoice/<int:booking_id>/", views.invoice, name="invoice"),  #
     path("payment/", views.payment, name="payment_new"),  #
     path("process-payment/", views.process_payment, name="process_payment"),  #
+    path("metrics/db-pool/", views.db_pool_metrics, name="db_pool_metrics"),
+    path("metrics/", views.metrics, name="metrics"),
+    path("api/categories/", api.categories, name="api_categories"),
+    path(
+        "api/categories/<str:category>/spaces/",
+        api.category_spaces,
+        name="api_category_spaces",
+    ),
+    path("api/spaces/<int:space_id>/", api.space_detail, name="api_space"),
+    path(
+        "api/spaces/<int:space_id>/availability/",
+        api.space_availability_query,
+        name="api_space_availability",
+    ),
 ]
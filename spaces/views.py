@@ -1,15 +1,49 @@
-import math
-from datetime import date, datetime, timedelta
+import secrets
+from datetime import UTC, date, datetime, timedelta
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate
 from django.contrib.auth import login as auth_login
 from django.contrib.auth import logout as auth_logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.contrib.auth.views import redirect_to_login
+from django.db.models import Q
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
-from .models import Booking, BusinessSpace, Category
+from django.utils import timezone
+
+from .availability import (
+    DEFAULT_HORIZON_DAYS,
+    MIN_BOOKING_DAYS,
+    next_free_window,
+    parse_booking_dates,
+    space_availability,
+)
+from .conditional import (
+    categories_stamp,
+    category_stamp,
+    conditional_page,
+    invoice_stamp,
+)
+from .dbpool import pool_stats
+from .exports import invoice_context
+from .holds import BookingConflict, convert_hold, place_hold, place_slot_hold
+from .instrumentation import prometheus_text
+from .listings import acategories, acategory_codes, acategory_listing, space_page
+from .models import Booking, BusinessSpace, Category, ReservationHold
+from .pricing import booking_days, quote, quote_many, quote_slots
+from .slots import (
+    day_slots,
+    describe,
+    is_slot_space,
+    slot_indexes,
+    slot_mask,
+    slot_minutes,
+)
 
 
 # Create your views here.
@@ -22,17 +56,8 @@ def login(request):
         username_or_email = request.POST.get("username")
         pword = request.POST.get("password")
 
-        # username or mail 
-        if "@" in username_or_email:
-            try:
-                user_obj = User.objects.get(email=username_or_email)
-                username = user_obj.username
-            except User.DoesNotExist:
-                username = username_or_email
-        else:
-            username = username_or_email
-
-        user = authenticate(request, username=username, password=pword)
+        # username or mail - see spaces.auth.EmailOrUsernameBackend
+        user = authenticate(request, username=username_or_email, password=pword)
 
         if user is not None:
             auth_login(request, user) 
@@ -56,11 +81,11 @@ def register(request):
         cpword = request.POST.get("cpassword")  # Confirm password
 
         #  Checks
-        if User.objects.filter(username=uname).exists():
+        if User.objects.filter(username__iexact=uname).exists():
             messages.error(request, "Username already taken")
             return redirect("register")
 
-        if User.objects.filter(email=email).exists():
+        if User.objects.filter(email__iexact=email).exists():
             messages.error(request, "Email already registered")
             return redirect("register")
 
@@ -78,13 +103,33 @@ def register(request):
     return render(request, "register.html")
 
 
-def home(request):
-    return render(request, "index.html")
+async def arender(request, template_name, context=None):
+    """render() for async views.
+
+    The data is loaded with the async ORM beforehand; templates, context
+    processors and the session are synchronous, so they run in a thread.
+    The user is resolved here once, so templates reuse the instance that
+    login_required already loaded.
+    """
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, template_name, context)
+
+
+async def home(request):
+    return await arender(request, "index.html")
 
 
-def rentals(request):
-    category = Category.objects.all()
-    return render(request, "rentals.html", {"category": category})
+@conditional_page(categories_stamp)
+async def rentals(request):
+    category = await acategories()
+    return await arender(request, "rentals.html", {"category": category})
+
+
+def _not_rented_message(space):
+    return (
+        f"None of the selected dates fall on this space's rental days "
+        f"({space.duration_type})"
+    )
 
 
 @login_required(login_url="login")
@@ -92,9 +137,17 @@ def booking(request, space_id):
     storage = messages.get_messages(request)
     list(storage)
     space = get_object_or_404(BusinessSpace, id=space_id)
-    today = date.today()
+    if is_slot_space(space):
+        return slot_booking(request, space)
+    today = timezone.localdate()
 
-    context = {"space": space, "min_date": today}
+    calendar = space_availability(space, start=today)
+    context = {
+        "space": space,
+        "min_date": today,
+        "booked_ranges": [[str(start), str(end)] for start, end in calendar["booked"]],
+        "free_windows": calendar["free"],
+    }
 
     if request.method == "POST":
         action = request.POST.get("action")
@@ -111,51 +164,27 @@ def booking(request, space_id):
         )
 
         try:
-            from_date = datetime.strptime(from_date_str, "%Y-%m-%d").date()
-            to_date = datetime.strptime(to_date_str, "%Y-%m-%d").date()
-        except ValueError:
-            messages.error(request, "Invalid date format")
+            from_date, to_date = parse_booking_dates(from_date_str, to_date_str, today)
+        except ValueError as error:
+            messages.error(request, str(error))
             return render(request, "booking.html", context)
 
-        #  From date must be today or future
-        if from_date < today:
-            messages.error(request, "From date cannot be in the past")
+        # total days and cost
+        days, billable, total_cost = quote(space, from_date, to_date)
+        if not billable:
+            messages.error(request, _not_rented_message(space))
             return render(request, "booking.html", context)
 
-        #  To date after from date
-        if from_date > to_date:
-            messages.error(request, "To date must be after from date")
-            return render(request, "booking.html", context)
-
-        #  Same day booking check 
-        if from_date == to_date:
-            messages.error(request, "Booking must be for at least 2 days")
-            return render(request, "booking.html", context)
-
-        # total days
-        days = (to_date - from_date).days + 1
-
-        # cost calculation
-        if space.rent_type == "Day Wise":
-            total_cost = days * space.cost
-        elif space.rent_type == "Week Wise":
-            weeks = math.ceil(days / 7)
-            total_cost = weeks * space.cost
-        elif space.rent_type == "Hour Wise":
-            total_cost = space.cost
-        elif space.rent_type == "SqFt":
-            total_cost = days * space.cost
-        else:
-            total_cost = 0
-
-        #  availability check - find conflicting bookings
-        conflicting_bookings = Booking.objects.filter(
-            space=space, from_date__lte=to_date, to_date__gte=from_date
-        )
-
-        is_booked = conflicting_bookings.exists()
-
         if action == "check":
+            #  availability check - bookings and other users' live holds
+            is_booked = (
+                Booking.objects.overlapping(space, from_date, to_date).exists()
+                or ReservationHold.objects.active()
+                .overlapping(space, from_date, to_date)
+                .exclude(user=request.user)
+                .exists()
+            )
+
             context.update(
                 {
                     "available": not is_booked and space.availability,
@@ -164,89 +193,250 @@ def booking(request, space_id):
                 }
             )
 
-            #  next available date 
+            #  next available date
             if is_booked:
-                last_booking = conflicting_bookings.order_by("-to_date").first()
-                next_available = last_booking.to_date + timedelta(days=1)
-                context["next_available"] = next_available
-
-                # another booking after this
-                next_booking = (
-                    Booking.objects.filter(
-                        space=space, from_date__gt=last_booking.to_date
-                    )
-                    .order_by("from_date")
-                    .first()
+                window = next_free_window(
+                    space_availability(space, start=from_date), from_date
                 )
-
-                if next_booking:
-                    # no of days before next booking
-                    next_booking_end = next_booking.from_date - timedelta(days=1)
-                    context["next_booking_start"] = next_booking_end
+                if window:
+                    context["next_available"], context["next_booking_start"] = window
 
             return render(request, "booking.html", context)
 
         elif action == "confirm":
-            if not space.availability:
-                messages.error(request, "This space is not available for rent")
-                return render(request, "booking.html", context)
-            elif is_booked:
-                conflicting = conflicting_bookings.first()
-                messages.error(
-                    request,
-                    f"Space already booked from {conflicting.from_date} to {conflicting.to_date}",
-                )
+            try:
+                hold = place_hold(request.user, space, from_date, to_date, total_cost)
+            except BookingConflict as error:
+                messages.error(request, str(error))
                 return render(request, "booking.html", context)
-            else:
-                # Store booking details in session not DB
-                request.session["pending_booking"] = {
-                    "space_id": space.id,
-                    "from_date": from_date_str,
-                    "to_date": to_date_str,
-                    "total_cost": str(total_cost),
-                    "days": days,
-                }
-                # Redirect to payment page
-                return redirect("payment_new")  # 
+
+            # The hold reserves the dates, the session just points at it
+            request.session["pending_booking"] = {
+                "hold_id": hold.id,
+                "space_id": space.id,
+                "from_date": from_date_str,
+                "to_date": to_date_str,
+                "total_cost": str(total_cost),
+                "days": days,
+            }
+            # Redirect to payment page
+            return redirect("payment_new")
 
     return render(request, "booking.html", context)
 
 
-def rentalsview(request, category):
-    if not Category.objects.filter(category=category).exists():
+def slot_booking(request, space):
+    """Booking form of spaces rented by the hour: time slots of one day."""
+    today = timezone.localdate()
+    try:
+        day = date.fromisoformat(request.POST.get("day") or request.GET.get("day"))
+    except (TypeError, ValueError):
+        day = today
+    if day < today:
+        day = today
+
+    # one query: the day's slot bitmap and any whole-day booking
+    slots = day_slots(space, day)
+    free = slot_mask(index for index, _, is_free in slots if is_free)
+    context = {
+        "space": space,
+        "min_date": today,
+        "day": day,
+        "slots": slots,
+        "slot_minutes": slot_minutes(),
+    }
+
+    if request.method == "POST":
+        action = request.POST.get("action")
+        try:
+            mask = slot_mask(request.POST.getlist("slots"))
+        except ValueError as error:
+            messages.error(request, str(error))
+            return render(request, "booking_slots.html", context)
+
+        if not mask:
+            messages.error(request, "Please select at least one time slot")
+            return render(request, "booking_slots.html", context)
+
+        _, billable, total_cost = quote_slots(
+            space, day, mask.bit_count(), slot_minutes()
+        )
+        if not billable:
+            messages.error(request, _not_rented_message(space))
+            return render(request, "booking_slots.html", context)
+        context.update(
+            {
+                "selected": slot_indexes(mask),
+                "checked": True,
+                "available": not mask & ~free and space.availability,
+                "hours": describe(mask),
+                "total_cost": total_cost,
+            }
+        )
+
+        if action == "confirm":
+            try:
+                hold = place_slot_hold(request.user, space, day, mask, total_cost)
+            except BookingConflict as error:
+                messages.error(request, str(error))
+                return render(request, "booking_slots.html", context)
+
+            request.session["pending_booking"] = {
+                "hold_id": hold.id,
+                "space_id": space.id,
+                "from_date": day.isoformat(),
+                "to_date": day.isoformat(),
+                "total_cost": str(total_cost),
+                "days": 1,
+                "slots": describe(mask),
+            }
+            return redirect("payment_new")
+
+    return render(request, "booking_slots.html", context)
+
+
+def availability(request, space_id):
+    space = get_object_or_404(BusinessSpace, id=space_id)
+
+    try:
+        start = datetime.strptime(
+            request.GET.get("from", timezone.localdate().isoformat()), "%Y-%m-%d"
+        ).date()
+        horizon_days = min(int(request.GET.get("days", DEFAULT_HORIZON_DAYS)), 730)
+        min_days = max(int(request.GET.get("min_days", MIN_BOOKING_DAYS)), 1)
+    except ValueError:
+        return JsonResponse({"error": "Invalid query parameters"}, status=400)
+
+    result = space_availability(space, start, horizon_days, min_days)
+
+    return JsonResponse(
+        {
+            "space": space.id,
+            "from": result["start"],
+            "to": result["end"],
+            "min_days": min_days,
+            "available": space.availability,
+            "booked": result["booked"],
+            "free": result["free"],
+        }
+    )
+
+
+def _page_after(request):
+    """Keyset pagination - the page after the last space id seen."""
+    try:
+        return int(request.GET.get("after", 0))
+    except ValueError:
+        return 0
+
+
+@conditional_page(category_stamp)
+async def rentalsview(request, category):
+    if category not in await acategory_codes():
         messages.warning(request, "No such category found")
         return redirect("rentals")
 
-    business_spaces = BusinessSpace.objects.filter(category__category=category)
+    # search mode - only spaces free for the requested dates
+    from_date_str = request.GET.get("from_date")
+    to_date_str = request.GET.get("to_date")
+    search = None
+    if from_date_str or to_date_str:
+        try:
+            search = parse_booking_dates(from_date_str, to_date_str)
+        except ValueError as error:
+            messages.error(request, str(error))
+
+    business_spaces, next_after = await acategory_listing(
+        category, _page_after(request), search
+    )
 
     for space in business_spaces:
         # Default values
         space.status = "available"
-        space.booked_till = None
-        space.available_from = date.today()
-
-        if space.availability:
-            last_booking = (
-                Booking.objects.filter(space=space).order_by("-to_date").first()
-            )
+        space.available_from = timezone.localdate()
 
-            if last_booking:
-                space.status = "booked"
-                space.booked_till = last_booking.to_date
-                space.available_from = last_booking.to_date + timedelta(days=1)
-        else:
+        if not space.availability:
             space.status = "not_rentable"
+        elif space.booked_till:
+            space.status = "booked"
+            space.available_from = space.booked_till + timedelta(days=1)
 
-    return render(
+    if search:
+        quotes = await sync_to_async(quote_many)(
+            [(space, *search) for space in business_spaces]
+        )
+        # spaces that bill none of the searched days cannot be booked for them
+        bookable = []
+        for space, space_quote in zip(business_spaces, quotes):
+            if space_quote.billable_days:
+                space.quoted_total = space_quote.total
+                bookable.append(space)
+        business_spaces = bookable
+
+    return await arender(
         request,
         "products/index.html",
         {
             "businessSpace": business_spaces,
             "category": category,
+            "next_after": next_after,
+            "search": search,
+            "from_date": from_date_str,
+            "to_date": to_date_str,
         },
     )
 
 
+def available_spaces(request, category):
+    # category codes are not unique, so no get()
+    if not Category.objects.filter(category=category).exists():
+        raise Http404("No such category")
+
+    try:
+        from_date, to_date = parse_booking_dates(
+            request.GET.get("from_date"), request.GET.get("to_date")
+        )
+    except ValueError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+
+    spaces, next_after = space_page(
+        BusinessSpace.objects.filter(category__category=category).free_between(
+            from_date, to_date
+        ),
+        _page_after(request),
+    )
+
+    quotes = quote_many((space, from_date, to_date) for space in spaces)
+    # spaces that bill none of the requested days cannot be booked for them
+    bookable = [
+        (space, space_quote)
+        for space, space_quote in zip(spaces, quotes)
+        if space_quote.billable_days
+    ]
+
+    return JsonResponse(
+        {
+            "category": category,
+            "from_date": from_date,
+            "to_date": to_date,
+            "days": booking_days(from_date, to_date),
+            "spaces": [
+                {
+                    "id": space.id,
+                    "name": space.name,
+                    "rent_type": space.rent_type,
+                    "duration_type": space.duration_type,
+                    "cost": space.cost,
+                    "billable_days": space_quote.billable_days,
+                    "total_cost": space_quote.total,
+                }
+                for space, space_quote in bookable
+            ],
+            "next_after": next_after,
+        }
+    )
+
+
 @login_required(login_url="login")
 def payment(request):
     #   booking w/o payement from session
@@ -264,6 +454,7 @@ def payment(request):
         "to_date": pending["to_date"],
         "total_cost": pending["total_cost"],
         "days": pending["days"],
+        "slots": pending.get("slots"),
     }
 
     return render(request, "payment.html", context)
@@ -278,35 +469,13 @@ def process_payment(request):
             messages.error(request, "No pending booking found")
             return redirect("rentals")
 
-        space = get_object_or_404(BusinessSpace, id=pending["space_id"])
-        from_date = datetime.strptime(pending["from_date"], "%Y-%m-%d").date()
-        to_date = datetime.strptime(pending["to_date"], "%Y-%m-%d").date()
-
-        # Check availability again before locking
-        conflicting = Booking.objects.filter(
-            space=space,
-            from_date__lte=to_date,
-            to_date__gte=from_date,
-            is_paid=True,  # Only check paid bookings
-        ).exists()
-
-        if conflicting:
-            messages.error(
-                request, "Sorry, this space was just booked by someone else!"
-            )
+        try:
+            booking = convert_hold(pending.get("hold_id"), request.user)
+        except BookingConflict as error:
+            messages.error(request, str(error))
             del request.session["pending_booking"]
             return redirect("rentals")
 
-        # booking lock
-        booking = Booking.objects.create(
-            user=request.user,
-            space=space,
-            from_date=from_date,
-            to_date=to_date,
-            total_cost=pending["total_cost"],
-            is_paid=True,  # Mark as paid
-        )
-
         # Clear session
         del request.session["pending_booking"]
 
@@ -319,27 +488,92 @@ def process_payment(request):
     return redirect("home")
 
 
+BOOKINGS_PAGE_SIZE = 20
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _booking_cursor(booking):
+    """Keyset cursor for "my bookings": created_at (epoch microseconds) and id."""
+    micros = (booking.created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}-{booking.id}"
+
+
+def _parse_booking_cursor(value):
+    try:
+        micros, booking_id = value.split("-")
+        return EPOCH + timedelta(microseconds=int(micros)), int(booking_id)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+async def _booking_page(request):
+    """One page of the user's bookings, newest first, after ``?before=``."""
+    user = await request.auser()
+    bookings = (
+        Booking.objects.filter(user=user)
+        .select_related("space__category")
+        .order_by("-created_at", "-id")
+    )
+    cursor = _parse_booking_cursor(request.GET.get("before"))
+    if cursor:
+        created_at, booking_id = cursor
+        bookings = bookings.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=booking_id)
+        )
+
+    page = [booking async for booking in bookings[: BOOKINGS_PAGE_SIZE + 1]]
+    next_before = None
+    if len(page) > BOOKINGS_PAGE_SIZE:
+        page = page[:BOOKINGS_PAGE_SIZE]
+        next_before = _booking_cursor(page[-1])
+    return {"bookings": page, "next_before": next_before}
+
+
 @login_required(login_url="login")
-def my_bookings(request):
-    bookings = Booking.objects.filter(user=request.user).order_by("-created_at")
+async def my_bookings(request):
+    context = await _booking_page(request)
+    return await arender(request, "my_bookings.html", context)
+
 
-    return render(request, "my_bookings.html", {"bookings": bookings})
+@login_required(login_url="login")
+async def my_bookings_more(request):
+    """The "load more" fragment: the next page of booking cards only."""
+    context = await _booking_page(request)
+    return await arender(request, "partials/booking_cards.html", context)
 
 
 @login_required(login_url="login")
+@conditional_page(invoice_stamp)
 def invoice(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id, user=request.user)
+    booking = get_object_or_404(
+        Booking.objects.select_related("space__category", "user"),
+        id=booking_id,
+        user=request.user,
+    )
 
-    context = {
-        "booking": booking,
-        "space": booking.space,
-        "invoice_number": f"INV-{booking.id:05d}",
-        "invoice_date": booking.created_at,
-    }
+    context = invoice_context(booking)
 
     return render(request, "invoice.html", context)
 
 
+@staff_member_required
+def db_pool_metrics(request):
+    stats = pool_stats()
+    return JsonResponse({"pooled": stats is not None, "pool": stats})
+
+
+def metrics(request):
+    # scrapers send the bearer token, people sign in as staff
+    token = getattr(settings, "INSTRUMENTATION_METRICS_TOKEN", "")
+    sent = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not (token and secrets.compare_digest(sent, token)):
+        if not request.user.is_staff:
+            return redirect_to_login(request.get_full_path(), "admin:login")
+    return HttpResponse(
+        prometheus_text(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 def logout_page(request):
     auth_logout(request)
     messages.success(request, "You have been logged out.")